@@ -0,0 +1,50 @@
+from flask import request
+from app import db
+from app.caching import get_cached_rows
+
+# Most ids a single batch lookup may ask for
+MAX_BATCH_IDS = 100
+
+def parse_ids():
+    """
+    Read the ids of a batch lookup from ?ids=3,1,2
+
+    Returns:
+        The ids in request order, without repeats
+
+    Raises:
+        ValueError: If ids is missing, malformed or longer than MAX_BATCH_IDS
+    """
+    try:
+        ids = [int(part) for part in request.args.get('ids', '').split(',') if part.strip()]
+    except ValueError:
+        raise ValueError('ids must be a comma separated list of integers')
+    if not ids:
+        raise ValueError('ids is required')
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f'A batch may contain at most {MAX_BATCH_IDS} ids')
+    return ids
+
+def get_batch(resource, model, dumper, ids, options=()):
+    """
+    Serialize the rows with the given ids for a batch endpoint
+
+    Rows come from the cache first; the misses are loaded with one IN query.
+
+    Args:
+        resource: Cache namespace of the model (e.g. 'mechanics')
+        model: The mapped class to look up
+        dumper: FastDumper for a single row, possibly projected
+        ids: Ids from parse_ids()
+        options: Loader options for the query (e.g. from project())
+
+    Returns:
+        A tuple of (serialized rows in the order of ids, ids not found)
+    """
+    def load(missing):
+        rows = db.session.execute(db.select(model).where(model.id.in_(missing)).options(*options)).scalars()
+        return {row.id: dumper.dump(row) for row in rows}
+
+    found = get_cached_rows(resource, ids, load, variant=','.join(dumper.fields))
+    return [found[row_id] for row_id in ids if row_id in found], [row_id for row_id in ids if row_id not in found]
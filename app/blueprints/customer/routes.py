@@ -1,10 +1,15 @@
 from flask import request, jsonify
-from app import db, limiter, cache
-from app.models import Customer
+from app import db, limiter
+from app.models import Customer, ServiceTicket
 from . import customer_bp
-from .schemas import customer_schema, customers_schema, login_schema
+from .schemas import customer_schema, customer_fast_schema, customers_fast_schema, login_schema
 from marshmallow import ValidationError
-from app.utils import hash_password, verify_password, encode_token, token_required
+from app.utils import hash_password, verify_password, password_needs_rehash, encode_token, token_required, revoke_customer_tokens
+from app.pagination import keyset_paginate
+from app.projection import project
+from app.batch import parse_ids, get_batch
+from app.caching import resource_cached, bump_cache_version
+from app.changes import record_changes, DELETE
 
 # POST /login - Login a customer
 @customer_bp.route('/login', methods=['POST'])
@@ -25,6 +30,13 @@ def login():
         if not verify_password(validated_data['password'], customer.password):
             return jsonify({"error": "Invalid email or password"}), 401
         
+        # Transparently upgrade hashes made with an old work factor
+        if password_needs_rehash(customer.password):
+            customer.password = hash_password(validated_data['password'])
+            record_changes('customers', [customer.id])
+            db.session.commit()
+            bump_cache_version('customers')
+        
         # Generate token
         token = encode_token(customer.id)
         
@@ -45,9 +57,22 @@ def get_my_tickets(customer_id):
     if not customer:
         return jsonify({"error": "Customer not found"}), 404
     
-    # Get all service tickets for this customer
-    from app.blueprints.service_ticket.schemas import service_tickets_schema
-    return jsonify(service_tickets_schema.dump(customer.service_tickets)), 200
+    # Get all service tickets for this customer with mechanics, parts and
+    # customer eagerly loaded in a fixed number of batched queries (only the
+    # relationships a ?fields= projection asks for are loaded)
+    from app.blueprints.service_ticket.schemas import service_tickets_detail_fast_schema, ticket_detail_loaders
+    try:
+        dumper, options = project(service_tickets_detail_fast_schema, ServiceTicket)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    loaders = [loader for name, loader in ticket_detail_loaders.items() if name in dumper.fields]
+    service_tickets = db.session.execute(
+        db.select(ServiceTicket)
+        .where(ServiceTicket.customer_id == customer_id)
+        .order_by(ServiceTicket.id)
+        .options(*options, *loaders)
+    ).unique().scalars().all()
+    return jsonify(dumper.dump(service_tickets)), 200
 
 # POST / - Create a new customer (with rate limiting)
 @customer_bp.route('/', methods=['POST'])
@@ -62,48 +87,54 @@ def create_customer():
         
         customer = customer_schema.load(data)
         db.session.add(customer)
+        db.session.flush()
+        record_changes('customers', [customer.id])
         db.session.commit()
+        bump_cache_version('customers')
         return jsonify(customer_schema.dump(customer)), 201
     except ValidationError as e:
         return jsonify(e.messages), 400
 
-# GET / - Get all customers (with caching)
+# GET / - Get all customers (with caching and keyset pagination)
 @customer_bp.route('/', methods=['GET'])
-@cache.cached(timeout=60, query_string=True)
+@resource_cached('customers')
 def get_customers():
-    # Get pagination parameters
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
-    
-    # Query customers with pagination
-    pagination = db.paginate(
-        db.select(Customer).order_by(Customer.id),
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
-    
-    customers = pagination.items
+    try:
+        dumper, options = project(customers_fast_schema, Customer, Customer.id)
+        customers, pagination = keyset_paginate(db.select(Customer).options(*options), Customer.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     return jsonify({
-        "customers": customers_schema.dump(customers),
-        "pagination": {
-            "page": pagination.page,
-            "per_page": pagination.per_page,
-            "total": pagination.total,
-            "pages": pagination.pages,
-            "has_next": pagination.has_next,
-            "has_prev": pagination.has_prev
-        }
+        "customers": dumper.dump(customers),
+        "pagination": pagination
     }), 200
 
+# GET /batch - Get several customers by id (?ids=3,1,2)
+@customer_bp.route('/batch', methods=['GET'])
+@resource_cached('customers')
+def get_customers_batch():
+    try:
+        ids = parse_ids()
+        dumper, options = project(customer_fast_schema, Customer)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    customers, missing_ids = get_batch('customers', Customer, dumper, ids, options)
+    return jsonify({"customers": customers, "missing_ids": missing_ids}), 200
+
 # GET /<int:id> - Get a specific customer
 @customer_bp.route('/<int:id>', methods=['GET'])
+@resource_cached('customers', model=Customer)
 def get_customer(id):
-    customer = db.session.get(Customer, id)
+    try:
+        dumper, options = project(customer_fast_schema, Customer)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    customer = db.session.get(Customer, id, options=options)
     if not customer:
         return jsonify({"error": "Customer not found"}), 404
-    return jsonify(customer_schema.dump(customer)), 200
+    return jsonify(dumper.dump(customer)), 200
 
 # PUT /<int:id> - Update a customer (requires token)
 @customer_bp.route('/<int:id>', methods=['PUT'])
@@ -127,7 +158,9 @@ def update_customer(customer_id, id):
         if 'password' in data:
             customer.password = hash_password(data['password'])
         
+        record_changes('customers', [id])
         db.session.commit()
+        bump_cache_version('customers')
         return jsonify(customer_schema.dump(customer)), 200
     except ValidationError as e:
         return jsonify(e.messages), 400
@@ -143,6 +176,16 @@ def delete_customer(customer_id, id):
     customer = db.session.get(Customer, id)
     if not customer:
         return jsonify({"error": "Customer not found"}), 404
+    # Every ticket needs a customer, so the service history is never
+    # deleted or orphaned along with the account
+    has_tickets = db.session.execute(
+        db.select(ServiceTicket.id).where(ServiceTicket.customer_id == id).limit(1)
+    ).first() is not None
+    if has_tickets:
+        return jsonify({"error": "Customer has service tickets and cannot be deleted"}), 409
     db.session.delete(customer)
+    record_changes('customers', [id], DELETE)
+    revoke_customer_tokens(id)
     db.session.commit()
+    bump_cache_version('customers')
     return jsonify({"message": f"Customer {id} deleted successfully"}), 200
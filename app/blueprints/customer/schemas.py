@@ -2,6 +2,7 @@ from marshmallow import fields
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from app.models import Customer
 from app import db
+from app.fast_dump import FastDumper
 
 class CustomerSchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -10,6 +11,7 @@ class CustomerSchema(SQLAlchemyAutoSchema):
         include_fk = True
         sqla_session = db.session
         load_only = ('password',)  # Don't return password in responses
+        dump_only = ('version', 'updated_at')  # Maintained by the database layer
 
 class LoginSchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -26,3 +28,7 @@ customers_schema = CustomerSchema(many=True)
 
 # Schema for login
 login_schema = LoginSchema()
+
+# Precompiled dumpers for read paths (same output as the schemas above)
+customer_fast_schema = FastDumper(customer_schema)
+customers_fast_schema = FastDumper(customers_schema)
@@ -1,9 +1,14 @@
 from flask import request, jsonify
 from app import db
-from app.models import Inventory
+from app.models import Inventory, service_inventory
 from . import inventory_bp
-from .schemas import inventory_schema, inventories_schema
+from .schemas import inventory_schema, inventory_fast_schema, inventories_fast_schema
 from marshmallow import ValidationError
+from app.pagination import keyset_paginate
+from app.projection import project
+from app.batch import parse_ids, get_batch
+from app.caching import resource_cached, bump_cache_version
+from app.changes import record_changes, DELETE
 
 # POST / - Create a new inventory part
 @inventory_bp.route('/', methods=['POST'])
@@ -12,24 +17,54 @@ def create_inventory():
         data = request.get_json()
         inventory = inventory_schema.load(data)
         db.session.add(inventory)
+        db.session.flush()
+        record_changes('inventory', [inventory.id])
         db.session.commit()
+        bump_cache_version('inventory')
         return jsonify(inventory_schema.dump(inventory)), 201
     except ValidationError as e:
         return jsonify(e.messages), 400
 
-# GET / - Get all inventory parts
+# GET / - Get all inventory parts (keyset pagination)
 @inventory_bp.route('/', methods=['GET'])
+@resource_cached('inventory')
 def get_inventories():
-    inventories = db.session.execute(db.select(Inventory)).scalars().all()
-    return jsonify(inventories_schema.dump(inventories)), 200
+    try:
+        dumper, options = project(inventories_fast_schema, Inventory, Inventory.id)
+        inventories, pagination = keyset_paginate(db.select(Inventory).options(*options), Inventory.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "inventory": dumper.dump(inventories),
+        "pagination": pagination
+    }), 200
+
+# GET /batch - Get several inventory parts by id (?ids=3,1,2)
+@inventory_bp.route('/batch', methods=['GET'])
+@resource_cached('inventory')
+def get_inventory_batch():
+    try:
+        ids = parse_ids()
+        dumper, options = project(inventory_fast_schema, Inventory)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    inventory, missing_ids = get_batch('inventory', Inventory, dumper, ids, options)
+    return jsonify({"inventory": inventory, "missing_ids": missing_ids}), 200
 
 # GET /<int:id> - Get a specific inventory part
 @inventory_bp.route('/<int:id>', methods=['GET'])
+@resource_cached('inventory', model=Inventory)
 def get_inventory(id):
-    inventory = db.session.get(Inventory, id)
+    try:
+        dumper, options = project(inventory_fast_schema, Inventory)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    inventory = db.session.get(Inventory, id, options=options)
     if not inventory:
         return jsonify({"error": "Inventory part not found"}), 404
-    return jsonify(inventory_schema.dump(inventory)), 200
+    return jsonify(dumper.dump(inventory)), 200
 
 # PUT /<int:id> - Update an inventory part
 @inventory_bp.route('/<int:id>', methods=['PUT'])
@@ -42,7 +77,9 @@ def update_inventory(id):
         inventory.name = data.get('name', inventory.name)
         inventory.price = data.get('price', inventory.price)
         
+        record_changes('inventory', [id])
         db.session.commit()
+        bump_cache_version('inventory', 'service_tickets')
         return jsonify(inventory_schema.dump(inventory)), 200
     except ValidationError as e:
         return jsonify(e.messages), 400
@@ -53,6 +90,13 @@ def delete_inventory(id):
     inventory = db.session.get(Inventory, id)
     if not inventory:
         return jsonify({"error": "Inventory part not found"}), 404
+    # Deleting the part removes it from its tickets
+    ticket_ids = db.session.execute(
+        db.select(service_inventory.c.service_ticket_id).where(service_inventory.c.inventory_id == id)
+    ).scalars().all()
     db.session.delete(inventory)
+    record_changes('inventory', [id], DELETE)
+    record_changes('service_tickets', ticket_ids)
     db.session.commit()
+    bump_cache_version('inventory', 'service_tickets')
     return jsonify({"message": f"Inventory part {id} deleted successfully"}), 200
@@ -2,6 +2,7 @@ from marshmallow import fields
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from app.models import Inventory
 from app import db
+from app.fast_dump import FastDumper
 
 class InventorySchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -9,9 +10,14 @@ class InventorySchema(SQLAlchemyAutoSchema):
         load_instance = True
         include_fk = True
         sqla_session = db.session
+        dump_only = ('version', 'updated_at')  # Maintained by the database layer
 
 # Schema for single inventory item
 inventory_schema = InventorySchema()
 
 # Schema for multiple inventory items
 inventories_schema = InventorySchema(many=True)
+
+# Precompiled dumpers for read paths (same output as the schemas above)
+inventory_fast_schema = FastDumper(inventory_schema)
+inventories_fast_schema = FastDumper(inventories_schema)
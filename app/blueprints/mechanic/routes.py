@@ -1,10 +1,14 @@
 from flask import request, jsonify
 from app import db
-from app.models import Mechanic
+from app.models import Mechanic, MechanicWorkload, service_mechanic
 from . import mechanic_bp
-from .schemas import mechanic_schema, mechanics_schema
+from .schemas import mechanic_schema, mechanic_fast_schema, mechanics_fast_schema
 from marshmallow import ValidationError
-from sqlalchemy import func
+from app.pagination import keyset_paginate
+from app.projection import project
+from app.batch import parse_ids, get_batch
+from app.caching import resource_cached, bump_cache_version
+from app.changes import record_changes, DELETE
 
 # POST / - Create a new mechanic
 @mechanic_bp.route('/', methods=['POST'])
@@ -13,50 +17,88 @@ def create_mechanic():
         data = request.get_json()
         mechanic = mechanic_schema.load(data)
         db.session.add(mechanic)
+        db.session.flush()
+        # Every mechanic has a workload row so /by-tickets can use an inner join
+        db.session.add(MechanicWorkload(mechanic_id=mechanic.id, ticket_count=0))
+        record_changes('mechanics', [mechanic.id])
         db.session.commit()
+        bump_cache_version('mechanics')
         return jsonify(mechanic_schema.dump(mechanic)), 201
     except ValidationError as e:
         return jsonify(e.messages), 400
 
-# GET / - Get all mechanics
+# GET / - Get all mechanics (keyset pagination)
 @mechanic_bp.route('/', methods=['GET'])
+@resource_cached('mechanics')
 def get_mechanics():
-    mechanics = db.session.execute(db.select(Mechanic)).scalars().all()
-    return jsonify(mechanics_schema.dump(mechanics)), 200
+    try:
+        dumper, options = project(mechanics_fast_schema, Mechanic, Mechanic.id)
+        mechanics, pagination = keyset_paginate(db.select(Mechanic).options(*options), Mechanic.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "mechanics": dumper.dump(mechanics),
+        "pagination": pagination
+    }), 200
 
 # GET /by-tickets - Get mechanics ordered by number of tickets worked on
 @mechanic_bp.route('/by-tickets', methods=['GET'])
+@resource_cached('mechanics')
 def get_mechanics_by_tickets():
-    from app.models import service_mechanic
+    # Read the maintained per-mechanic counts top-down along their index
+    # instead of joining and grouping service_mechanic on every call
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    try:
+        dumper, options = project(mechanic_fast_schema, Mechanic)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Query mechanics with count of service tickets, ordered by count descending
-    mechanics_with_counts = db.session.query(
-        Mechanic,
-        func.count(service_mechanic.c.service_ticket_id).label('ticket_count')
-    ).outerjoin(
-        service_mechanic, Mechanic.id == service_mechanic.c.mechanic_id
-    ).group_by(
-        Mechanic.id
-    ).order_by(
-        func.count(service_mechanic.c.service_ticket_id).desc()
-    ).all()
+    query = db.select(Mechanic, MechanicWorkload.ticket_count).join(
+        MechanicWorkload, Mechanic.id == MechanicWorkload.mechanic_id
+    ).options(*options).order_by(
+        MechanicWorkload.ticket_count.desc(), MechanicWorkload.mechanic_id
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    mechanics_with_counts = db.session.execute(query).all()
     
     # Format the response
     result = []
     for mechanic, ticket_count in mechanics_with_counts:
-        mechanic_data = mechanic_schema.dump(mechanic)
+        mechanic_data = dumper.dump(mechanic)
         mechanic_data['ticket_count'] = ticket_count
         result.append(mechanic_data)
     
     return jsonify(result), 200
 
+# GET /batch - Get several mechanics by id (?ids=3,1,2)
+@mechanic_bp.route('/batch', methods=['GET'])
+@resource_cached('mechanics')
+def get_mechanics_batch():
+    try:
+        ids = parse_ids()
+        dumper, options = project(mechanic_fast_schema, Mechanic)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    mechanics, missing_ids = get_batch('mechanics', Mechanic, dumper, ids, options)
+    return jsonify({"mechanics": mechanics, "missing_ids": missing_ids}), 200
+
 # GET /<int:id> - Get a specific mechanic
 @mechanic_bp.route('/<int:id>', methods=['GET'])
+@resource_cached('mechanics', model=Mechanic)
 def get_mechanic(id):
-    mechanic = db.session.get(Mechanic, id)
+    try:
+        dumper, options = project(mechanic_fast_schema, Mechanic)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    mechanic = db.session.get(Mechanic, id, options=options)
     if not mechanic:
         return jsonify({"error": "Mechanic not found"}), 404
-    return jsonify(mechanic_schema.dump(mechanic)), 200
+    return jsonify(dumper.dump(mechanic)), 200
 
 # PUT /<int:id> - Update a mechanic
 @mechanic_bp.route('/<int:id>', methods=['PUT'])
@@ -72,7 +114,9 @@ def update_mechanic(id):
         mechanic.address = data.get('address', mechanic.address)
         mechanic.salary = data.get('salary', mechanic.salary)
         
+        record_changes('mechanics', [id])
         db.session.commit()
+        bump_cache_version('mechanics', 'service_tickets')
         return jsonify(mechanic_schema.dump(mechanic)), 200
     except ValidationError as e:
         return jsonify(e.messages), 400
@@ -83,6 +127,14 @@ def delete_mechanic(id):
     mechanic = db.session.get(Mechanic, id)
     if not mechanic:
         return jsonify({"error": "Mechanic not found"}), 404
+    # Deleting the mechanic unassigns it from its tickets
+    ticket_ids = db.session.execute(
+        db.select(service_mechanic.c.service_ticket_id).where(service_mechanic.c.mechanic_id == id)
+    ).scalars().all()
+    db.session.execute(db.delete(MechanicWorkload).where(MechanicWorkload.mechanic_id == id))
     db.session.delete(mechanic)
+    record_changes('mechanics', [id], DELETE)
+    record_changes('service_tickets', ticket_ids)
     db.session.commit()
+    bump_cache_version('mechanics', 'service_tickets')
     return jsonify({"message": f"Mechanic {id} deleted successfully"}), 200
@@ -2,6 +2,7 @@ from marshmallow import fields
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from app.models import Mechanic
 from app import db
+from app.fast_dump import FastDumper
 
 class MechanicSchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -9,9 +10,14 @@ class MechanicSchema(SQLAlchemyAutoSchema):
         load_instance = True
         include_fk = True
         sqla_session = db.session
+        dump_only = ('version', 'updated_at')  # Maintained by the database layer
 
 # Schema for single mechanic
 mechanic_schema = MechanicSchema()
 
 # Schema for multiple mechanics
 mechanics_schema = MechanicSchema(many=True)
+
+# Precompiled dumpers for read paths (same output as the schemas above)
+mechanic_fast_schema = FastDumper(mechanic_schema)
+mechanics_fast_schema = FastDumper(mechanics_schema)
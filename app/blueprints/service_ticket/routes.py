@@ -1,9 +1,148 @@
-from flask import request, jsonify
+import csv
+import io
+import json
+from datetime import date
+from flask import request, jsonify, Response, stream_with_context
 from app import db
-from app.models import ServiceTicket, Mechanic, Inventory
+from app.models import Customer, ServiceTicket, Mechanic, Inventory, service_mechanic, service_inventory, touch
 from . import service_ticket_bp
-from .schemas import service_ticket_schema, service_tickets_schema
+from .schemas import (
+    service_ticket_schema, service_tickets_schema, service_ticket_rows_schema, service_ticket_detail_schema,
+    service_ticket_fast_schema, service_tickets_fast_schema, ticket_detail_options
+)
 from marshmallow import ValidationError
+from app.pagination import keyset_paginate, DEFAULT_PER_PAGE, MAX_PER_PAGE
+from app.projection import project, validate_fields
+from app.batch import parse_ids, get_batch
+from app.blueprints.customer.schemas import customer_fast_schema
+from app.blueprints.mechanic.schemas import mechanic_fast_schema
+from app.blueprints.inventory.schemas import inventory_fast_schema
+from app.caching import resource_cached, bump_cache_version
+from app.workload import adjust_ticket_counts
+from app.search import index_tickets, unindex_tickets, search_tickets
+from app.changes import record_changes, DELETE
+
+# Limits for POST /bulk
+MAX_BULK_TICKETS = 5000
+BULK_BATCH_SIZE = 500
+
+# Columns and chunk size for GET /export
+EXPORT_COLUMNS = (
+    ServiceTicket.id,
+    ServiceTicket.VIN,
+    ServiceTicket.description,
+    ServiceTicket.service_date,
+    ServiceTicket.customer_id
+)
+EXPORT_CHUNK_SIZE = 1000
+
+# Related rows GET /<id> and GET /batch can sideload with ?include=, as
+# (cache namespace, model, dumper)
+TICKET_INCLUDES = {
+    'customer': ('customers', Customer, customer_fast_schema),
+    'mechanics': ('mechanics', Mechanic, mechanic_fast_schema),
+    'parts': ('inventory', Inventory, inventory_fast_schema),
+}
+
+def get_ticket_with_details(ticket_id):
+    """Load a service ticket with its mechanics, parts and customer in batched queries"""
+    return db.session.execute(
+        db.select(ServiceTicket).where(ServiceTicket.id == ticket_id).options(*ticket_detail_options)
+    ).unique().scalar_one_or_none()
+
+def requested_includes():
+    """
+    Read the related rows to sideload from ?include=customer,mechanics,parts
+
+    Returns:
+        The TICKET_INCLUDES names asked for, in request order without repeats
+
+    Raises:
+        ValueError: If a name is not in TICKET_INCLUDES
+    """
+    names = list(dict.fromkeys(
+        name.strip() for name in request.args.get('include', '').split(',') if name.strip()
+    ))
+    unknown = [name for name in names if name not in TICKET_INCLUDES]
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}. Available: {', '.join(TICKET_INCLUDES)}")
+    return names
+
+def included_resources():
+    """Cache namespaces of the rows ?include= sideloads (unknown names are left to the view)"""
+    names = request.args.get('include', '').split(',')
+    return [TICKET_INCLUDES[name.strip()][0] for name in names if name.strip() in TICKET_INCLUDES]
+
+def compound_documents(tickets, includes):
+    """
+    Attach related ids, parts totals and sideloaded rows to serialized tickets
+
+    Every ticket gets its customer_id, mechanic_ids, part_ids and
+    parts_total. The rows asked for are listed once each under their
+    resource however many tickets share them, and come from the per-row
+    cache with one IN query per resource for the misses, so any number of
+    tickets takes at most six queries.
+
+    Args:
+        tickets: Serialized service tickets (possibly projected)
+        includes: Names from requested_includes()
+
+    Returns:
+        A tuple of (tickets with the related ids added, {resource: rows})
+    """
+    documents = {ticket['id']: {**ticket, 'mechanic_ids': [], 'part_ids': [], 'parts_total': 0.0} for ticket in tickets}
+    if not documents:
+        return [], {TICKET_INCLUDES[name][0]: [] for name in includes}
+    
+    # customer_id may have been projected away, so it's read with the links
+    for ticket_id, customer_id in db.session.execute(
+        db.select(ServiceTicket.id, ServiceTicket.customer_id).where(ServiceTicket.id.in_(documents))
+    ):
+        documents[ticket_id]['customer_id'] = customer_id
+    for ticket_id, mechanic_id in db.session.execute(
+        db.select(service_mechanic.c.service_ticket_id, service_mechanic.c.mechanic_id)
+        .where(service_mechanic.c.service_ticket_id.in_(documents))
+        .order_by(service_mechanic.c.service_ticket_id, service_mechanic.c.mechanic_id)
+    ):
+        documents[ticket_id]['mechanic_ids'].append(mechanic_id)
+    for ticket_id, part_id, price in db.session.execute(
+        db.select(service_inventory.c.service_ticket_id, service_inventory.c.inventory_id, Inventory.price)
+        .join(Inventory, Inventory.id == service_inventory.c.inventory_id)
+        .where(service_inventory.c.service_ticket_id.in_(documents))
+        .order_by(service_inventory.c.service_ticket_id, service_inventory.c.inventory_id)
+    ):
+        documents[ticket_id]['part_ids'].append(part_id)
+        documents[ticket_id]['parts_total'] += price
+    for document in documents.values():
+        document['parts_total'] = round(document['parts_total'], 2)
+    
+    related_ids = {
+        'customer': [document['customer_id'] for document in documents.values()],
+        'mechanics': [i for document in documents.values() for i in document['mechanic_ids']],
+        'parts': [i for document in documents.values() for i in document['part_ids']],
+    }
+    included = {}
+    for name in includes:
+        resource, model, dumper = TICKET_INCLUDES[name]
+        ids = list(dict.fromkeys(i for i in related_ids[name] if i is not None))
+        included[resource] = get_batch(resource, model, dumper, ids)[0] if ids else []
+    return list(documents.values()), included
+
+def insert_ticket_rows(rows):
+    """
+    Insert validated service ticket rows and return their new ids in order
+
+    The rows go in as one multi-row INSERT, whose ids the database assigns
+    in row order. Databases with RETURNING (SQLite, PostgreSQL, MariaDB)
+    return them with the same statement. MySQL reports the first id, and
+    InnoDB gives a multi-row INSERT consecutive ids in every
+    innodb_autoinc_lock_mode, so the rest follow from the row count.
+    """
+    stmt = db.insert(ServiceTicket).values(rows)
+    if db.session.get_bind().dialect.insert_returning:
+        return sorted(db.session.execute(stmt.returning(ServiceTicket.id)).scalars())
+    first_id = db.session.execute(stmt).lastrowid
+    return list(range(first_id, first_id + len(rows)))
 
 # POST / - Create a new service ticket
 @service_ticket_bp.route('/', methods=['POST'])
@@ -12,24 +151,316 @@ def create_service_ticket():
         data = request.get_json()
         service_ticket = service_ticket_schema.load(data)
         db.session.add(service_ticket)
+        db.session.flush()
+        index_tickets([(service_ticket.id, service_ticket.description)])
+        record_changes('service_tickets', [service_ticket.id])
         db.session.commit()
+        bump_cache_version('service_tickets')
         return jsonify(service_ticket_schema.dump(service_ticket)), 201
     except ValidationError as e:
         return jsonify(e.messages), 400
 
-# GET / - Get all service tickets
+# POST /bulk - Create many service tickets in one transaction
+@service_ticket_bp.route('/bulk', methods=['POST'])
+def bulk_create_service_tickets():
+    # Accept either a JSON array or an NDJSON body (one ticket per line)
+    if request.mimetype == 'application/x-ndjson':
+        items = []
+        for line_number, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                return jsonify({"error": f"Invalid JSON on line {line_number}"}), 400
+    else:
+        items = request.get_json()
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Request body must be a non-empty list of service tickets"}), 400
+    if len(items) > MAX_BULK_TICKETS:
+        return jsonify({"error": f"A batch may contain at most {MAX_BULK_TICKETS} service tickets"}), 413
+    
+    # Split the optional association ids off each item and validate the
+    # remaining ticket fields for the whole batch through the schema
+    tickets_data = []
+    link_ids = []
+    errors = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {"_schema": ["Invalid input type."]}
+            item = {}
+        item = dict(item)
+        mechanic_ids = item.pop('mechanic_ids', [])
+        part_ids = item.pop('part_ids', [])
+        if not (isinstance(mechanic_ids, list) and isinstance(part_ids, list)
+                and all(isinstance(i, int) for i in mechanic_ids + part_ids)):
+            errors.setdefault(index, {})['ids'] = ["mechanic_ids and part_ids must be lists of integers"]
+            mechanic_ids, part_ids = [], []
+        tickets_data.append(item)
+        link_ids.append((set(mechanic_ids), set(part_ids)))
+    for index, messages in service_tickets_schema.validate(tickets_data).items():
+        errors.setdefault(index, {}).update(messages)
+    
+    # Resolve every referenced customer, mechanic and part with one IN query each
+    valid = [i for i in range(len(items)) if i not in errors]
+    customer_ids = {tickets_data[i].get('customer_id') for i in valid} - {None}
+    mechanic_ids = set().union(*(link_ids[i][0] for i in valid))
+    part_ids = set().union(*(link_ids[i][1] for i in valid))
+    known_customers = set(db.session.execute(
+        db.select(Customer.id).where(Customer.id.in_(customer_ids))
+    ).scalars()) if customer_ids else set()
+    known_mechanics = set(db.session.execute(
+        db.select(Mechanic.id).where(Mechanic.id.in_(mechanic_ids))
+    ).scalars()) if mechanic_ids else set()
+    known_parts = set(db.session.execute(
+        db.select(Inventory.id).where(Inventory.id.in_(part_ids))
+    ).scalars()) if part_ids else set()
+    for i in valid:
+        customer_id = tickets_data[i].get('customer_id')
+        if customer_id is not None and customer_id not in known_customers:
+            errors.setdefault(i, {})['customer_id'] = [f"Unknown customer {customer_id}"]
+        if link_ids[i][0] - known_mechanics:
+            errors.setdefault(i, {})['mechanic_ids'] = [f"Unknown mechanics {sorted(link_ids[i][0] - known_mechanics)}"]
+        if link_ids[i][1] - known_parts:
+            errors.setdefault(i, {})['part_ids'] = [f"Unknown parts {sorted(link_ids[i][1] - known_parts)}"]
+    valid = [i for i in valid if i not in errors]
+    
+    # Insert tickets chunk by chunk, then the association rows for each chunk
+    # as one executemany INSERT per table, all inside a single transaction
+    created_ids = {}
+    for start in range(0, len(valid), BULK_BATCH_SIZE):
+        chunk = valid[start:start + BULK_BATCH_SIZE]
+        rows = service_ticket_rows_schema.load([tickets_data[i] for i in chunk])
+        ticket_ids = insert_ticket_rows(rows)
+        index_tickets((ticket_id, row['description']) for ticket_id, row in zip(ticket_ids, rows))
+        mechanic_rows = []
+        part_rows = []
+        for i, ticket_id in zip(chunk, ticket_ids):
+            created_ids[i] = ticket_id
+            mechanic_rows.extend({"service_ticket_id": ticket_id, "mechanic_id": m} for m in sorted(link_ids[i][0]))
+            part_rows.extend({"service_ticket_id": ticket_id, "inventory_id": p} for p in sorted(link_ids[i][1]))
+        if mechanic_rows:
+            db.session.execute(service_mechanic.insert(), mechanic_rows)
+            adjust_ticket_counts(row["mechanic_id"] for row in mechanic_rows)
+        if part_rows:
+            db.session.execute(service_inventory.insert(), part_rows)
+    record_changes('service_tickets', created_ids.values())
+    db.session.commit()
+    bump_cache_version('service_tickets', 'mechanics')
+    
+    results = []
+    for index in range(len(items)):
+        if index in created_ids:
+            results.append({"index": index, "id": created_ids[index]})
+        else:
+            results.append({"index": index, "errors": errors[index]})
+    
+    return jsonify({
+        "created": len(created_ids),
+        "failed": len(errors),
+        "results": results
+    }), 201 if created_ids else 400
+
+# GET / - Get all service tickets (keyset pagination)
 @service_ticket_bp.route('/', methods=['GET'])
+@resource_cached('service_tickets')
 def get_service_tickets():
-    service_tickets = db.session.execute(db.select(ServiceTicket)).scalars().all()
-    return jsonify(service_tickets_schema.dump(service_tickets)), 200
+    try:
+        dumper, options = project(service_tickets_fast_schema, ServiceTicket, ServiceTicket.id)
+        service_tickets, pagination = keyset_paginate(db.select(ServiceTicket).options(*options), ServiceTicket.id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "service_tickets": dumper.dump(service_tickets),
+        "pagination": pagination
+    }), 200
+
+# GET /search - Search service tickets by VIN, service date and customer
+@service_ticket_bp.route('/search', methods=['GET'])
+@resource_cached('service_tickets')
+def search_service_tickets():
+    vin = request.args.get('vin', '').strip().upper()
+    vin_prefix = request.args.get('vin_prefix', '').strip().upper()
+    customer_id = request.args.get('customer_id', type=int)
+    try:
+        start_date = date.fromisoformat(request.args['start_date']) if request.args.get('start_date') else None
+        end_date = date.fromisoformat(request.args['end_date']) if request.args.get('end_date') else None
+    except ValueError:
+        return jsonify({"error": "start_date and end_date must be YYYY-MM-DD"}), 400
+    if not (vin or vin_prefix or customer_id is not None or start_date or end_date):
+        return jsonify({"error": "Provide at least one of vin, vin_prefix, customer_id, start_date or end_date"}), 400
+    
+    query = db.select(ServiceTicket)
+    if vin:
+        query = query.where(ServiceTicket.VIN == vin)
+    if vin_prefix:
+        escaped = vin_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = query.where(ServiceTicket.VIN.like(escaped + '%', escape='\\'))
+    if customer_id is not None:
+        query = query.where(ServiceTicket.customer_id == customer_id)
+    if start_date:
+        query = query.where(ServiceTicket.service_date >= start_date)
+    if end_date:
+        query = query.where(ServiceTicket.service_date <= end_date)
+    
+    # Page along whichever index matches the most selective filter:
+    # (VIN, id) and (customer_id, id) give id order for equality matches,
+    # while prefix and date range scans walk (VIN, id) / (service_date, id)
+    if vin or customer_id is not None:
+        order_columns = (ServiceTicket.id,)
+    elif vin_prefix:
+        order_columns = (ServiceTicket.VIN, ServiceTicket.id)
+    else:
+        order_columns = (ServiceTicket.service_date, ServiceTicket.id)
+    
+    try:
+        dumper, options = project(service_tickets_fast_schema, ServiceTicket, *order_columns)
+        service_tickets, pagination = keyset_paginate(query.options(*options), *order_columns)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "service_tickets": dumper.dump(service_tickets),
+        "pagination": pagination
+    }), 200
+
+# GET /search/text - Ranked full-text search over ticket descriptions
+@service_ticket_bp.route('/search/text', methods=['GET'])
+@resource_cached('service_tickets')
+def text_search_service_tickets():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    limit = max(1, min(request.args.get('limit', DEFAULT_PER_PAGE, type=int), MAX_PER_PAGE))
+    try:
+        dumper, options = project(service_ticket_fast_schema, ServiceTicket)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    matches = search_tickets(query, limit)
+    
+    # Load the matching tickets in one query and keep the ranking order
+    tickets_by_id = {}
+    if matches:
+        tickets_by_id = {
+            ticket.id: ticket
+            for ticket in db.session.execute(
+                db.select(ServiceTicket)
+                .where(ServiceTicket.id.in_([ticket_id for ticket_id, _ in matches]))
+                .options(*options)
+            ).scalars()
+        }
+    results = []
+    for ticket_id, score in matches:
+        if ticket_id in tickets_by_id:
+            ticket_data = dumper.dump(tickets_by_id[ticket_id])
+            ticket_data['score'] = score
+            results.append(ticket_data)
+    
+    return jsonify({"query": query, "service_tickets": results}), 200
+
+# GET /export - Stream every service ticket as NDJSON or CSV
+@service_ticket_bp.route('/export', methods=['GET'])
+def export_service_tickets():
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    try:
+        names = validate_fields([column.key for column in EXPORT_COLUMNS])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    export_columns = [column for column in EXPORT_COLUMNS if names is None or column.key in names]
+    
+    # Optional filters: service date range (inclusive) and customer. The id
+    # is always selected as the keyset cursor, even when not exported
+    stmt = db.select(ServiceTicket.id, *export_columns).order_by(ServiceTicket.id).limit(EXPORT_CHUNK_SIZE)
+    try:
+        if request.args.get('start_date'):
+            stmt = stmt.where(ServiceTicket.service_date >= date.fromisoformat(request.args['start_date']))
+        if request.args.get('end_date'):
+            stmt = stmt.where(ServiceTicket.service_date <= date.fromisoformat(request.args['end_date']))
+    except ValueError:
+        return jsonify({"error": "start_date and end_date must be YYYY-MM-DD"}), 400
+    customer_id = request.args.get('customer_id', type=int)
+    if customer_id is not None:
+        stmt = stmt.where(ServiceTicket.customer_id == customer_id)
+    
+    # Rows are read EXPORT_CHUNK_SIZE at a time with keyset queries
+    # (WHERE id > last id) and written out chunk by chunk. Each chunk is a
+    # short query of its own, so memory stays flat for any table size even
+    # on drivers that buffer whole result sets (e.g. mysql-connector)
+    def chunks():
+        last_id = 0
+        while True:
+            rows = db.session.execute(stmt.where(ServiceTicket.id > last_id)).all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [row[1:] for row in rows]
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                return
+    
+    def generate():
+        columns = [column.key for column in export_columns]
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for rows in chunks():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in chunks():
+                yield ''.join(
+                    json.dumps(dict(zip(columns, row)), default=date.isoformat) + '\n'
+                    for row in rows
+                )
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=service_tickets.{export_format}'
+    return response
+
+# GET /batch - Get several service tickets by id (?ids=3,1,2)
+@service_ticket_bp.route('/batch', methods=['GET'])
+@resource_cached('service_tickets', related=included_resources)
+def get_service_tickets_batch():
+    try:
+        ids = parse_ids()
+        includes = requested_includes()
+        dumper, options = project(service_ticket_fast_schema, ServiceTicket)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    service_tickets, missing_ids = get_batch('service_tickets', ServiceTicket, dumper, ids, options)
+    if not includes:
+        return jsonify({"service_tickets": service_tickets, "missing_ids": missing_ids}), 200
+    service_tickets, included = compound_documents(service_tickets, includes)
+    return jsonify({"service_tickets": service_tickets, "missing_ids": missing_ids, "included": included}), 200
 
 # GET /<int:id> - Get a specific service ticket
 @service_ticket_bp.route('/<int:id>', methods=['GET'])
+@resource_cached('service_tickets', model=ServiceTicket, related=included_resources)
 def get_service_ticket(id):
-    service_ticket = db.session.get(ServiceTicket, id)
+    try:
+        includes = requested_includes()
+        dumper, options = project(service_ticket_fast_schema, ServiceTicket)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    service_ticket = db.session.get(ServiceTicket, id, options=options)
     if not service_ticket:
         return jsonify({"error": "Service ticket not found"}), 404
-    return jsonify(service_ticket_schema.dump(service_ticket)), 200
+    if not includes:
+        return jsonify(dumper.dump(service_ticket)), 200
+    # ?include= returns a compound document with the related rows sideloaded
+    (ticket_data,), included = compound_documents([dumper.dump(service_ticket)], includes)
+    return jsonify({"service_ticket": ticket_data, "included": included}), 200
 
 # PUT /<int:ticket_id>/edit - Add and remove mechanics from a service ticket
 @service_ticket_bp.route('/<int:ticket_id>/edit', methods=['PUT'])
@@ -38,33 +469,74 @@ def edit_ticket_mechanics(ticket_id):
     if not service_ticket:
         return jsonify({"error": "Service ticket not found"}), 404
     
-    data = request.get_json()
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
     remove_ids = data.get('remove_ids', [])
     add_ids = data.get('add_ids', [])
+    if not (isinstance(remove_ids, list) and isinstance(add_ids, list)
+            and all(isinstance(i, int) for i in remove_ids + add_ids)):
+        return jsonify({"error": "add_ids and remove_ids must be lists of integers"}), 400
+    remove_ids = set(remove_ids)
+    add_ids = set(add_ids)
+    requested_ids = remove_ids | add_ids
+    
+    # Resolve every requested mechanic id in a single IN query
+    known_ids = set()
+    if requested_ids:
+        known_ids = set(db.session.execute(
+            db.select(Mechanic.id).where(Mechanic.id.in_(requested_ids))
+        ).scalars())
     
-    # Remove mechanics
-    for mechanic_id in remove_ids:
-        mechanic = db.session.get(Mechanic, mechanic_id)
-        if mechanic and mechanic in service_ticket.mechanics:
-            service_ticket.mechanics.remove(mechanic)
+    # Current assignments straight from the association table
+    current_ids = set(db.session.execute(
+        db.select(service_mechanic.c.mechanic_id).where(service_mechanic.c.service_ticket_id == ticket_id)
+    ).scalars())
     
-    # Add mechanics
-    for mechanic_id in add_ids:
-        mechanic = db.session.get(Mechanic, mechanic_id)
-        if mechanic and mechanic not in service_ticket.mechanics:
-            service_ticket.mechanics.append(mechanic)
+    # Removals are applied before additions, so an id in both lists ends up assigned
+    target_ids = (current_ids - remove_ids) | (add_ids & known_ids)
+    ids_to_insert = target_ids - current_ids
+    ids_to_delete = current_ids - target_ids
+    
+    # Apply the diff as one bulk DELETE and one bulk (executemany) INSERT
+    if ids_to_delete:
+        db.session.execute(
+            service_mechanic.delete().where(
+                service_mechanic.c.service_ticket_id == ticket_id,
+                service_mechanic.c.mechanic_id.in_(ids_to_delete)
+            )
+        )
+    if ids_to_insert:
+        db.session.execute(
+            service_mechanic.insert(),
+            [{"service_ticket_id": ticket_id, "mechanic_id": mechanic_id} for mechanic_id in sorted(ids_to_insert)]
+        )
+    # The association rows changed behind the ORM's back, so bump the ticket's version
+    if ids_to_insert or ids_to_delete:
+        touch(service_ticket)
+        record_changes('service_tickets', [ticket_id])
+    
+    # Keep the per-mechanic ticket counts in step with the diff
+    adjust_ticket_counts({
+        **{mechanic_id: 1 for mechanic_id in ids_to_insert},
+        **{mechanic_id: -1 for mechanic_id in ids_to_delete}
+    })
     
     db.session.commit()
+    bump_cache_version('service_tickets', 'mechanics')
     
     return jsonify({
         "message": "Mechanics updated successfully",
-        "service_ticket": service_ticket_schema.dump(service_ticket)
+        "added_ids": sorted(ids_to_insert),
+        "removed_ids": sorted(ids_to_delete),
+        "unknown_ids": sorted(requested_ids - known_ids),
+        "service_ticket": service_ticket_detail_schema.dump(get_ticket_with_details(ticket_id))
     }), 200
 
 # PUT /<int:ticket_id>/add-part/<int:part_id> - Add a part to a service ticket
 @service_ticket_bp.route('/<int:ticket_id>/add-part/<int:part_id>', methods=['PUT'])
 def add_part_to_ticket(ticket_id, part_id):
-    service_ticket = db.session.get(ServiceTicket, ticket_id)
+    service_ticket = get_ticket_with_details(ticket_id)
     if not service_ticket:
         return jsonify({"error": "Service ticket not found"}), 404
     
@@ -78,17 +550,19 @@ def add_part_to_ticket(ticket_id, part_id):
     
     # Add part to service ticket
     service_ticket.inventory_parts.append(part)
+    record_changes('service_tickets', [ticket_id])
     db.session.commit()
+    bump_cache_version('service_tickets')
     
     return jsonify({
         "message": f"Part {part_id} added to Service Ticket {ticket_id}",
-        "service_ticket": service_ticket_schema.dump(service_ticket)
+        "service_ticket": service_ticket_detail_schema.dump(get_ticket_with_details(ticket_id))
     }), 200
 
 # PUT /<ticket_id>/assign-mechanic/<mechanic_id> - Assign a mechanic to a service ticket
 @service_ticket_bp.route('/<int:ticket_id>/assign-mechanic/<int:mechanic_id>', methods=['PUT'])
 def assign_mechanic(ticket_id, mechanic_id):
-    service_ticket = db.session.get(ServiceTicket, ticket_id)
+    service_ticket = get_ticket_with_details(ticket_id)
     if not service_ticket:
         return jsonify({"error": "Service ticket not found"}), 404
     mechanic = db.session.get(Mechanic, mechanic_id)
@@ -101,17 +575,20 @@ def assign_mechanic(ticket_id, mechanic_id):
     
     # Add mechanic to service ticket using the relationship
     service_ticket.mechanics.append(mechanic)
+    adjust_ticket_counts({mechanic_id: 1})
+    record_changes('service_tickets', [ticket_id])
     db.session.commit()
+    bump_cache_version('service_tickets', 'mechanics')
     
     return jsonify({
         "message": f"Mechanic {mechanic_id} assigned to Service Ticket {ticket_id}",
-        "service_ticket": service_ticket_schema.dump(service_ticket)
+        "service_ticket": service_ticket_detail_schema.dump(get_ticket_with_details(ticket_id))
     }), 200
 
 # PUT /<ticket_id>/remove-mechanic/<mechanic_id> - Remove a mechanic from a service ticket
 @service_ticket_bp.route('/<int:ticket_id>/remove-mechanic/<int:mechanic_id>', methods=['PUT'])
 def remove_mechanic(ticket_id, mechanic_id):
-    service_ticket = db.session.get(ServiceTicket, ticket_id)
+    service_ticket = get_ticket_with_details(ticket_id)
     if not service_ticket:
         return jsonify({"error": "Service ticket not found"}), 404
     mechanic = db.session.get(Mechanic, mechanic_id)
@@ -124,11 +601,14 @@ def remove_mechanic(ticket_id, mechanic_id):
     
     # Remove mechanic from service ticket using the relationship
     service_ticket.mechanics.remove(mechanic)
+    adjust_ticket_counts({mechanic_id: -1})
+    record_changes('service_tickets', [ticket_id])
     db.session.commit()
+    bump_cache_version('service_tickets', 'mechanics')
     
     return jsonify({
         "message": f"Mechanic {mechanic_id} removed from Service Ticket {ticket_id}",
-        "service_ticket": service_ticket_schema.dump(service_ticket)
+        "service_ticket": service_ticket_detail_schema.dump(get_ticket_with_details(ticket_id))
     }), 200
 
 # DELETE /<int:id> - Delete a service ticket
@@ -137,6 +617,16 @@ def delete_service_ticket(id):
     service_ticket = db.session.get(ServiceTicket, id)
     if not service_ticket:
         return jsonify({"error": "Service ticket not found"}), 404
+    
+    # Release the ticket from its mechanics' workload counts
+    mechanic_ids = db.session.execute(
+        db.select(service_mechanic.c.mechanic_id).where(service_mechanic.c.service_ticket_id == id)
+    ).scalars().all()
+    adjust_ticket_counts({mechanic_id: -1 for mechanic_id in mechanic_ids})
+    unindex_tickets([id])
+    
     db.session.delete(service_ticket)
+    record_changes('service_tickets', [id], DELETE)
     db.session.commit()
+    bump_cache_version('service_tickets', 'mechanics')
     return jsonify({"message": f"Service Ticket {id} deleted successfully"}), 200
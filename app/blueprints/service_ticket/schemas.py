@@ -1,7 +1,12 @@
 from marshmallow import fields
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
+from sqlalchemy.orm import joinedload, selectinload
 from app.models import ServiceTicket
 from app import db
+from app.fast_dump import FastDumper
+from app.blueprints.customer.schemas import CustomerSchema
+from app.blueprints.mechanic.schemas import MechanicSchema
+from app.blueprints.inventory.schemas import InventorySchema
 
 class ServiceTicketSchema(SQLAlchemyAutoSchema):
     class Meta:
@@ -9,9 +14,38 @@ class ServiceTicketSchema(SQLAlchemyAutoSchema):
         load_instance = True
         include_fk = True
         sqla_session = db.session
+        dump_only = ('id', 'version', 'updated_at')  # Assigned by the database layer
+
+class ServiceTicketDetailSchema(ServiceTicketSchema):
+    """Service ticket with its mechanics, parts and customer nested"""
+    mechanics = fields.Nested(MechanicSchema, many=True, dump_only=True)
+    inventory_parts = fields.Nested(InventorySchema, many=True, dump_only=True)
+    customer = fields.Nested(CustomerSchema, dump_only=True)
+
+# Loader options matching ServiceTicketDetailSchema, by nested field.
+# Collections are batched with one SELECT ... IN per relationship, so a page
+# of tickets always takes the same number of queries regardless of its size.
+ticket_detail_loaders = {
+    'mechanics': selectinload(ServiceTicket.mechanics),
+    'inventory_parts': selectinload(ServiceTicket.inventory_parts),
+    'customer': joinedload(ServiceTicket.customer)
+}
+ticket_detail_options = tuple(ticket_detail_loaders.values())
 
 # Schema for single service ticket
 service_ticket_schema = ServiceTicketSchema()
 
 # Schema for multiple service tickets
 service_tickets_schema = ServiceTicketSchema(many=True)
+
+# Schema validating many service tickets into plain dicts for bulk inserts
+service_ticket_rows_schema = ServiceTicketSchema(many=True, load_instance=False)
+
+# Schemas for service tickets with nested mechanics, parts and customer
+service_ticket_detail_schema = ServiceTicketDetailSchema()
+service_tickets_detail_schema = ServiceTicketDetailSchema(many=True)
+
+# Precompiled dumpers for read paths (same output as the schemas above)
+service_ticket_fast_schema = FastDumper(service_ticket_schema)
+service_tickets_fast_schema = FastDumper(service_tickets_schema)
+service_tickets_detail_fast_schema = FastDumper(service_tickets_detail_schema)
@@ -0,0 +1,206 @@
+import hashlib
+import uuid
+from collections import defaultdict
+from datetime import timezone
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, current_app, jsonify
+from app import cache, db
+from app.projection import requested_fields, column_options
+from app.utils import token_required
+
+# Hit/miss counters per resource for this worker process
+_cache_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+def _version_key(resource):
+    return f'version/{resource}'
+
+def get_cache_version(resource):
+    """
+    Return the current cache namespace version for a resource
+
+    A missing version (first use or evicted) is initialised to a fresh
+    random token, so it can never collide with entries cached under an
+    older version.
+    """
+    version = cache.get(_version_key(resource))
+    if version is None:
+        cache.add(_version_key(resource), uuid.uuid4().hex, timeout=0)
+        version = cache.get(_version_key(resource))
+    return version
+
+def bump_cache_version(*resources):
+    """
+    Invalidate every cached GET for the given resources
+
+    Entries are never deleted one by one: moving a resource to a new version
+    makes all of its old keys unreachable and they simply age out.
+    """
+    for resource in resources:
+        cache.set(_version_key(resource), uuid.uuid4().hex, timeout=0)
+
+def _request_path():
+    """The current path with its query arguments in a canonical order"""
+    return f'{request.path}?{urlencode(sorted(request.args.items(multi=True)))}'
+
+def make_resource_cache_key(resource, *related):
+    """
+    Build the cache key for the current request inside a resource's namespace
+
+    The versions of any related resources the response also depends on are
+    part of the key, so a write to either invalidates it.
+    """
+    namespace = '+'.join(f'{name}/{get_cache_version(name)}' for name in (resource, *related))
+    return f'view/{namespace}{_request_path()}'
+
+def _etag(data):
+    return hashlib.sha1(data).hexdigest()[:24]
+
+def get_row_version(model, row_id):
+    """Look up a versioned row's (version, updated_at) without loading it, or None"""
+    return db.session.execute(
+        db.select(model.version, model.updated_at).where(model.id == row_id)
+    ).one_or_none()
+
+def row_tag(row):
+    """Return the (ETag, Last-Modified) of a versioned row for the current request"""
+    return _etag(f'{_request_path()}|{row.version}'.encode()), row.updated_at.replace(tzinfo=timezone.utc)
+
+def _conditional(response, etag, last_modified):
+    """Tag a response and turn it into a 304 if the client's copy is current"""
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response.make_conditional(request)
+
+def resource_cached(resource, timeout=None, model=None, related=None):
+    """
+    Decorator caching a GET route's successful responses under a resource's
+    versioned namespace and answering conditional requests
+
+    Args:
+        resource: Name of the resource namespace (e.g. 'customers')
+        timeout: Seconds to keep entries, defaults to RESOURCE_CACHE_TIMEOUT
+        model: For detail routes taking an id, the Versioned model whose row
+            version makes the ETag and updated_at the Last-Modified header.
+            Other routes are tagged with a hash of their body
+        related: Function returning the other resources the current
+            request's response depends on (e.g. sideloaded rows). Their
+            versions join the cache key, and as the row version no longer
+            covers the whole body, such responses are tagged by hash
+
+    Writes call bump_cache_version(resource) to invalidate instantly, so
+    entries can be kept for a long time. Cached entries keep their tags, so
+    a matching If-None-Match is answered with a 304 without any query. On a
+    miss, a detail route looks up the row's version first and answers a
+    matching request with a 304 without running the view.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            related_resources = tuple(related()) if related is not None else ()
+            key = make_resource_cache_key(resource, *related_resources)
+            cached = cache.get(key)
+            if cached is not None:
+                _cache_stats[resource]['hits'] += 1
+                body, status, mimetype, etag, last_modified = cached
+                response = current_app.response_class(body, status=status, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return _conditional(response, etag, last_modified)
+
+            _cache_stats[resource]['misses'] += 1
+            tag = None
+            if model is not None and not related_resources:
+                # A revalidation only needs the version. Otherwise the row is
+                # loaded here and held, so the view finds it in the session
+                # and the tag matches the body exactly. Reading the version
+                # first means a concurrent write can only leave a newer body
+                # under an older tag, never the reverse
+                revalidating = bool(request.if_none_match or request.if_modified_since)
+                if revalidating:
+                    row = get_row_version(model, kwargs['id'])
+                else:
+                    # Only the columns a ?fields= projection will read
+                    names = requested_fields()
+                    options = column_options(model, names, model.version, model.updated_at) if names else ()
+                    row = db.session.get(model, kwargs['id'], options=options)
+                tag = row_tag(row) if row is not None else None
+                if tag is not None and revalidating:
+                    response = _conditional(current_app.response_class(), *tag)
+                    if response.status_code == 304:
+                        response.headers['X-Cache'] = 'MISS'
+                        return response
+
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                etag, last_modified = tag or (_etag(response.get_data()), None)
+                cache.set(
+                    key,
+                    (response.get_data(), response.status_code, response.mimetype, etag, last_modified),
+                    timeout=timeout if timeout is not None else current_app.config['RESOURCE_CACHE_TIMEOUT']
+                )
+                response = _conditional(response, etag, last_modified)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return decorated_function
+    return decorator
+
+def get_cached_rows(resource, ids, load, variant=''):
+    """
+    Return serialized rows by id, taking whatever the cache has first
+
+    Each row is cached on its own inside the resource's versioned namespace,
+    so a batch reuses the rows fetched by earlier batches whatever ids they
+    asked for. The cache is read with one get_many() and all misses are
+    passed to load in a single call.
+
+    Args:
+        resource: Name of the resource namespace (e.g. 'mechanics')
+        ids: Row ids to look up
+        load: Function taking a list of ids and returning {id: row data}
+            for those that exist
+        variant: Key part telling apart different serializations of the
+            same rows (e.g. a ?fields= projection)
+
+    Returns:
+        A dict of {id: row data} for the ids that exist
+    """
+    prefix = f'row/{resource}/{get_cache_version(resource)}/{variant}/'
+    found = {
+        row_id: data
+        for row_id, data in zip(ids, cache.get_many(*(f'{prefix}{row_id}' for row_id in ids)))
+        if data is not None
+    }
+    missing = [row_id for row_id in ids if row_id not in found]
+    if missing:
+        loaded = load(missing)
+        if loaded:
+            cache.set_many(
+                {f'{prefix}{row_id}': data for row_id, data in loaded.items()},
+                timeout=current_app.config['RESOURCE_CACHE_TIMEOUT']
+            )
+            found.update(loaded)
+    return found
+
+def get_cache_stats():
+    """Return hit/miss counters and hit rate per resource for this process"""
+    stats = {}
+    for resource, counts in _cache_stats.items():
+        total = counts['hits'] + counts['misses']
+        stats[resource] = {
+            'hits': counts['hits'],
+            'misses': counts['misses'],
+            'hit_rate': round(counts['hits'] / total, 4) if total else 0.0
+        }
+    return stats
+
+def init_cache_stats(app):
+    """Register the GET /cache/stats endpoint when STATS_ENDPOINTS is set"""
+    if not app.config.setdefault('STATS_ENDPOINTS', False):
+        return
+
+    @app.route('/cache/stats', methods=['GET'])
+    @token_required
+    def cache_stats(customer_id):
+        return jsonify(get_cache_stats()), 200
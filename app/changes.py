@@ -0,0 +1,217 @@
+from datetime import timedelta
+from sqlalchemy import func
+from flask import request, current_app, jsonify
+from app import db
+from app.database import use_primary
+from app.models import (
+    Change, Customer, Mechanic, Inventory, ServiceTicket, service_mechanic, service_inventory, utcnow
+)
+
+# Change kinds: the row was created or modified, or it was deleted.
+# prune_changes() turns the newest change it removes into a PRUNED marker
+UPSERT = 'upsert'
+DELETE = 'delete'
+PRUNED = 'pruned'
+
+# Changes read per GET /changes page
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
+
+# Changes deleted per transaction by prune_changes()
+PRUNE_CHUNK_SIZE = 10000
+
+# Resources in the feed and their models
+RESOURCE_MODELS = {
+    'customers': Customer,
+    'mechanics': Mechanic,
+    'inventory': Inventory,
+    'service_tickets': ServiceTicket,
+}
+
+def record_changes(resource, ids, op=UPSERT):
+    """
+    Append changes to the feed in the current transaction
+
+    Call it just before committing the write it describes: a change only
+    reaches GET /changes once CHANGE_FEED_SETTLE_SECONDS have passed since
+    it was recorded, which must cover the time until its commit.
+
+    Args:
+        resource: A RESOURCE_MODELS key (e.g. 'service_tickets')
+        ids: Ids of the rows that were created, modified or deleted
+        op: UPSERT or DELETE
+    """
+    recorded_at = utcnow()
+    rows = [
+        {"resource": resource, "resource_id": resource_id, "op": op, "recorded_at": recorded_at}
+        for resource_id in dict.fromkeys(ids)
+    ]
+    if rows:
+        db.session.execute(Change.__table__.insert(), rows)
+
+def _settled_before():
+    return utcnow() - timedelta(seconds=current_app.config['CHANGE_FEED_SETTLE_SECONDS'])
+
+def latest_cursor():
+    """Return the cursor of the newest settled change, or 0 when there are none"""
+    cursor = db.session.execute(
+        db.select(Change.id).where(Change.recorded_at <= _settled_before()).order_by(Change.id.desc()).limit(1)
+    ).scalar()
+    return cursor or 0
+
+def cursor_expired(cursor):
+    """Return whether changes after a cursor may have been pruned from the feed"""
+    oldest = db.session.execute(db.select(Change.id, Change.op).order_by(Change.id).limit(1)).one_or_none()
+    return oldest is not None and oldest.op == PRUNED and cursor < oldest.id
+
+def prune_changes(retention_days):
+    """
+    Delete the changes recorded more than retention_days ago
+
+    The newest of them is kept as a PRUNED marker, so a cursor from before
+    it can be told apart and answered with 410 Gone instead of silently
+    missing the deleted changes. Rows are deleted PRUNE_CHUNK_SIZE ids at a
+    time, one transaction each.
+
+    Args:
+        retention_days: Age in days after which changes are deleted
+
+    Returns:
+        The number of changes deleted
+    """
+    cutoff = utcnow() - timedelta(days=retention_days)
+    horizon = db.session.execute(db.select(func.max(Change.id)).where(Change.recorded_at < cutoff)).scalar()
+    if horizon is None:
+        return 0
+    start = db.session.execute(db.select(func.min(Change.id))).scalar()
+    deleted = 0
+    while start < horizon:
+        end = min(start + PRUNE_CHUNK_SIZE, horizon)
+        deleted += db.session.execute(
+            Change.__table__.delete().where(Change.id >= start, Change.id < end)
+        ).rowcount
+        db.session.commit()
+        start = end
+    db.session.execute(Change.__table__.update().where(Change.id == horizon).values(op=PRUNED))
+    db.session.commit()
+    return deleted
+
+def _dumpers():
+    # Imported here because the blueprints import this module
+    from app.blueprints.customer.schemas import customers_fast_schema
+    from app.blueprints.mechanic.schemas import mechanics_fast_schema
+    from app.blueprints.inventory.schemas import inventories_fast_schema
+    from app.blueprints.service_ticket.schemas import service_tickets_fast_schema
+    return {
+        'customers': customers_fast_schema,
+        'mechanics': mechanics_fast_schema,
+        'inventory': inventories_fast_schema,
+        'service_tickets': service_tickets_fast_schema,
+    }
+
+def _load_current(resource, ids):
+    """Return {id: serialized row} for the rows of a resource that still exist"""
+    model = RESOURCE_MODELS[resource]
+    rows = db.session.execute(db.select(model).where(model.id.in_(ids))).scalars().all()
+    data = {item['id']: item for item in _dumpers()[resource].dump(rows)}
+    if resource == 'service_tickets' and data:
+        # Tickets carry their assignments as id lists, the shape POST /bulk accepts
+        for item in data.values():
+            item['mechanic_ids'] = []
+            item['part_ids'] = []
+        for table, column, key in ((service_mechanic, 'mechanic_id', 'mechanic_ids'),
+                                   (service_inventory, 'inventory_id', 'part_ids')):
+            links = db.session.execute(
+                db.select(table.c.service_ticket_id, table.c[column])
+                .where(table.c.service_ticket_id.in_(data))
+                .order_by(table.c.service_ticket_id, table.c[column])
+            )
+            for ticket_id, linked_id in links:
+                data[ticket_id][key].append(linked_id)
+    return data
+
+def read_changes(cursor, limit=DEFAULT_CHANGES_LIMIT):
+    """
+    Read the feed after a cursor
+
+    Several changes to the same row within the page collapse into one entry
+    carrying the row's current state, or a tombstone if it no longer exists.
+    Rows are loaded with one IN query per resource, so a page costs a fixed
+    number of queries.
+
+    Args:
+        cursor: The next_cursor of the previous page (0 for the whole feed)
+        limit: Most changes to read
+
+    Returns:
+        A tuple of (entries in change order, next cursor, whether more
+        settled changes follow)
+    """
+    changes = db.session.execute(
+        db.select(Change.id, Change.resource, Change.resource_id, Change.recorded_at)
+        .where(Change.id > cursor)
+        .order_by(Change.id)
+        .limit(limit + 1)
+    ).all()
+    # Stop at the first unsettled change: an earlier id may still be
+    # waiting to commit, and the cursor must never move past it
+    settled_before = _settled_before()
+    page = []
+    for change in changes[:limit]:
+        if change.recorded_at > settled_before:
+            break
+        page.append(change)
+    has_more = len(page) == limit and len(changes) > limit and changes[limit].recorded_at <= settled_before
+    if not page:
+        return [], cursor, False
+
+    latest = {}
+    for change in page:
+        latest.pop((change.resource, change.resource_id), None)
+        latest[(change.resource, change.resource_id)] = change.id
+
+    ids_by_resource = {}
+    for resource, resource_id in latest:
+        ids_by_resource.setdefault(resource, []).append(resource_id)
+    current = {resource: _load_current(resource, ids) for resource, ids in ids_by_resource.items()}
+
+    entries = []
+    for (resource, resource_id), change_id in latest.items():
+        data = current[resource].get(resource_id)
+        if data is None:
+            entries.append({"cursor": change_id, "resource": resource, "id": resource_id, "op": DELETE})
+        else:
+            entries.append({"cursor": change_id, "resource": resource, "id": resource_id, "op": UPSERT, "data": data})
+    return entries, page[-1].id, has_more
+
+def init_change_feed(app):
+    """
+    Register the GET /changes delta sync endpoint on a Flask app
+
+    The feed is always read from the primary database: on a lagging replica
+    a cursor could move past changes that have not replicated yet.
+
+    Config:
+        CHANGE_FEED_SETTLE_SECONDS: Age a change must reach before it is
+            served, covering commits that finish out of id order (default: 2)
+        CHANGE_FEED_RETENTION_DAYS: Age after which prune_changes.py deletes
+            changes (default: 30)
+    """
+    app.config.setdefault('CHANGE_FEED_SETTLE_SECONDS', 2)
+    app.config.setdefault('CHANGE_FEED_RETENTION_DAYS', 30)
+
+    @app.route('/changes', methods=['GET'])
+    def get_changes():
+        use_primary(db.session)
+        if 'cursor' not in request.args:
+            # Start of a sync: hand out the cursor to follow after a full download
+            return jsonify({"changes": [], "next_cursor": latest_cursor(), "has_more": False}), 200
+        cursor = request.args.get('cursor', type=int)
+        if cursor is None or cursor < 0:
+            return jsonify({"error": "cursor must be a non-negative integer"}), 400
+        limit = max(1, min(request.args.get('limit', DEFAULT_CHANGES_LIMIT, type=int), MAX_CHANGES_LIMIT))
+        if cursor_expired(cursor):
+            return jsonify({"error": "cursor is older than the feed's retention; download everything again"}), 410
+
+        entries, next_cursor, has_more = read_changes(cursor, limit)
+        return jsonify({"changes": entries, "next_cursor": next_cursor, "has_more": has_more}), 200
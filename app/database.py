@@ -0,0 +1,101 @@
+import os
+import random
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+
+# SQLALCHEMY_BINDS keys of the read replicas are this prefix plus a number
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Request methods that only read, so their queries may run on a replica
+READ_METHODS = ('GET', 'HEAD')
+
+def _is_memory_sqlite(uri):
+    return uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri)
+
+def engine_options(uri):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the environment
+
+    Pre-ping checks a pooled connection before handing it out and recycle
+    replaces connections before the server's idle timeout (MySQL's
+    wait_timeout) closes them, which together prevent stale-connection errors.
+
+    Env:
+        DB_POOL_SIZE: Connections kept open per engine (default: 10)
+        DB_MAX_OVERFLOW: Extra connections allowed under load (default: 20)
+        DB_POOL_TIMEOUT: Seconds to wait for a free connection (default: 30)
+        DB_POOL_RECYCLE: Seconds before a connection is replaced (default: 1800)
+        DB_POOL_PRE_PING: 1 to test connections before use, 0 to skip (default: 1)
+
+    Args:
+        uri: The primary database URI
+
+    Returns:
+        A dict of create_engine() keyword arguments, applied to every bind
+    """
+    options = {
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1',
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    }
+    # In-memory SQLite uses a single static connection with no pool to size
+    if not _is_memory_sqlite(uri):
+        options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 10))
+        options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+        options['pool_timeout'] = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    return options
+
+def replica_binds():
+    """
+    Build SQLALCHEMY_BINDS entries for the read replicas
+
+    Env:
+        DATABASE_REPLICA_URLS: Comma separated replica URIs (default: none)
+
+    Returns:
+        A dict of {'replica_0': uri, 'replica_1': uri, ...}
+    """
+    urls = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    return {f'{REPLICA_BIND_PREFIX}{i}': url for i, url in enumerate(urls)}
+
+def use_primary(session):
+    """
+    Keep the rest of a session's queries on the primary database
+
+    For GET routes that must see every committed write, where a lagging
+    replica would return wrong results rather than merely stale ones.
+
+    Args:
+        session: The session, e.g. db.session for the current request
+    """
+    session.info['use_primary'] = True
+
+class RoutingSession(Session):
+    """
+    Session that runs the queries of read-only requests on a read replica
+
+    During a GET or HEAD request, anything that would go to the primary
+    database goes to a replica instead, picked at random once per session
+    (so once per request). Writes, flushes and every other request method
+    stay on the primary, as do scripts running outside a request and
+    sessions marked with use_primary(). Models with their own bind key are
+    never rerouted.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or self._flushing or self.info.get('use_primary'):
+            return engine
+        primary, replica = self._replica_route()
+        if replica is not None and engine is primary and has_request_context() and request.method in READ_METHODS:
+            return replica
+        return engine
+
+    def _replica_route(self):
+        """Return (primary engine, replica engine or None), chosen once per session"""
+        route = self.info.get('replica_route')
+        if route is None:
+            engines = self._db.engines
+            replicas = [key for key in engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+            replica = engines[random.choice(replicas)] if replicas else None
+            route = self.info['replica_route'] = (engines[None], replica)
+        return route
@@ -0,0 +1,221 @@
+import hashlib
+import random
+import time
+from datetime import date, timedelta
+from multiprocessing import Pool
+from sqlalchemy import func
+from app import db
+from app.models import Customer, Mechanic, Inventory, ServiceTicket, TicketTerm, service_mechanic, service_inventory
+from app.search import tokenize
+from app.utils import hash_password
+from app.workload import rebuild_mechanic_workloads
+
+# Rows generated per unit of scale; --scale 1000 gives 1M customers and 10M tickets
+SCALE_UNIT = {
+    'customers': 1000,
+    'mechanics': 10,
+    'inventory': 20,
+    'service_tickets': 10000,
+}
+
+# Rows generated and inserted per chunk
+DEFAULT_CHUNK_SIZE = 10000
+
+# Every generated customer can log in with this password
+DEFAULT_PASSWORD = 'password123'
+
+# Service dates fall in the DATE_RANGE_DAYS before LAST_SERVICE_DATE
+LAST_SERVICE_DATE = date(2026, 6, 30)
+DATE_RANGE_DAYS = 3 * 365
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David',
+               'Elizabeth', 'William', 'Susan', 'Carlos', 'Maria', 'Wei', 'Aisha', 'Raj', 'Yuki', 'Omar', 'Ana']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Lee', 'Nguyen', 'Patel', 'Kim', 'Chen', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Moore']
+STREETS = ['Main St', 'Oak Ave', 'Pine Rd', 'Maple Dr', 'Cedar Ln', 'Elm St', 'Lake Blvd', 'Hill Rd', 'Park Ave']
+SERVICES = ['Oil change', 'Filter replacement', 'Brake pad replacement', 'Rotor resurfacing', 'Battery replacement',
+            'Tire rotation', 'Wheel alignment', 'Transmission fluid change', 'Coolant flush', 'Spark plug replacement',
+            'Timing belt replacement', 'Diagnostic scan', 'AC recharge', 'Suspension repair', 'Exhaust repair',
+            'Wiper blade replacement', 'Headlight restoration', 'Fuel injector cleaning', 'Engine tune-up']
+SYMPTOMS = ['squealing brakes', 'check engine light', 'rough idle', 'grinding noise', 'vibration at speed',
+            'slow start', 'overheating', 'pulling left', 'leaking fluid', 'weak air conditioning']
+PARTS = ['Oil Filter', 'Air Filter', 'Cabin Filter', 'Spark Plug', 'Brake Pads', 'Brake Rotor', 'Battery',
+         'Wiper Blade', 'Serpentine Belt', 'Timing Belt', 'Coolant', 'Transmission Fluid', 'Headlight Bulb',
+         'Fuel Injector', 'Shock Absorber', 'Muffler', 'Tire', 'Alternator', 'Starter', 'Radiator Hose']
+VIN_CHARACTERS = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+
+def plan_counts(scale):
+    """Return {table: rows to generate} for a scale factor"""
+    return {table: max(1, int(per_unit * scale)) for table, per_unit in SCALE_UNIT.items()}
+
+def _rng(seed, table, chunk):
+    """A random generator that depends only on the seed, table and chunk number"""
+    return random.Random(f'{seed}:{table}:{chunk}')
+
+def _person(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', f'{rng.randint(100, 9999)} {rng.choice(STREETS)}'
+
+def _vin(seed, customer_id, vehicle):
+    """A stable VIN for one of a customer's (up to two) vehicles"""
+    digest = hashlib.blake2b(f'{seed}:{customer_id}:{vehicle}'.encode(), digest_size=17).digest()
+    return ''.join(VIN_CHARACTERS[byte % len(VIN_CHARACTERS)] for byte in digest)
+
+def customer_rows(task):
+    """Generate one chunk of customers; task is (seed, chunk, first_id, count, password_hash)"""
+    seed, chunk, first_id, count, password_hash = task
+    rng = _rng(seed, 'customers', chunk)
+    rows = []
+    for row_id in range(first_id, first_id + count):
+        name, address = _person(rng)
+        rows.append({
+            'id': row_id, 'name': name, 'email': f'customer{row_id}@example.com',
+            'phone': f'555-{row_id % 10000:04d}', 'address': address, 'password': password_hash
+        })
+    return rows
+
+def mechanic_rows(task):
+    """Generate one chunk of mechanics; task is (seed, chunk, first_id, count)"""
+    seed, chunk, first_id, count = task
+    rng = _rng(seed, 'mechanics', chunk)
+    rows = []
+    for row_id in range(first_id, first_id + count):
+        name, address = _person(rng)
+        rows.append({
+            'id': row_id, 'name': name, 'email': f'mechanic{row_id}@mechanicshop.com',
+            'phone': f'555-{row_id % 10000:04d}', 'address': address,
+            'salary': float(rng.randrange(45000, 95000, 500))
+        })
+    return rows
+
+def inventory_rows(task):
+    """Generate one chunk of inventory parts; task is (seed, chunk, first_id, count)"""
+    seed, chunk, first_id, count = task
+    rng = _rng(seed, 'inventory', chunk)
+    return [
+        {'id': row_id, 'name': f'{rng.choice(PARTS)} #{row_id}', 'price': round(rng.uniform(4.99, 499.99), 2)}
+        for row_id in range(first_id, first_id + count)
+    ]
+
+def ticket_rows(task):
+    """
+    Generate one chunk of service tickets with their association and search rows
+
+    Args:
+        task: (seed, chunk, first_id, count, customer_ids, mechanic_ids, part_ids),
+            the last three being (first id, last id) ranges
+
+    Returns:
+        A tuple of (ticket rows, service_mechanic rows, service_inventory rows,
+        ticket_terms rows)
+    """
+    seed, chunk, first_id, count, customer_ids, mechanic_ids, part_ids = task
+    rng = _rng(seed, 'service_tickets', chunk)
+    tickets, mechanics, parts, terms = [], [], [], []
+    for ticket_id in range(first_id, first_id + count):
+        customer_id = rng.randint(*customer_ids)
+        description = rng.choice(SERVICES)
+        if rng.random() < 0.3:
+            description += f' and {rng.choice(SERVICES).lower()}'
+        if rng.random() < 0.4:
+            description += f', customer reports {rng.choice(SYMPTOMS)}'
+        tickets.append({
+            'id': ticket_id, 'VIN': _vin(seed, customer_id, rng.randrange(2)), 'description': description,
+            'service_date': LAST_SERVICE_DATE - timedelta(days=rng.randrange(DATE_RANGE_DAYS)),
+            'customer_id': customer_id
+        })
+        for mechanic_id in set(rng.randint(*mechanic_ids) for _ in range(rng.randint(1, 3))):
+            mechanics.append({'service_ticket_id': ticket_id, 'mechanic_id': mechanic_id})
+        for part_id in set(rng.randint(*part_ids) for _ in range(rng.randint(0, 3))):
+            parts.append({'service_ticket_id': ticket_id, 'inventory_id': part_id})
+        for term, frequency in tokenize(description).items():
+            terms.append({'term': term, 'service_ticket_id': ticket_id, 'frequency': frequency})
+    return tickets, mechanics, parts, terms
+
+def _chunks(seed, total, first_id, chunk_size, *extra):
+    """Yield (seed, chunk, first id, count, *extra) tasks covering total ids from first_id"""
+    for chunk, offset in enumerate(range(0, total, chunk_size)):
+        yield (seed, chunk, first_id + offset, min(chunk_size, total - offset)) + extra
+
+def _next_id(model):
+    return (db.session.execute(db.select(func.max(model.id))).scalar() or 0) + 1
+
+def _insert(table, rows):
+    if rows:
+        db.session.execute(table.insert(), rows)
+
+def generate(scale, seed=0, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, password=DEFAULT_PASSWORD, log=print):
+    """
+    Bulk-load a synthetic dataset sized by a scale factor
+
+    Rows are generated in chunks on a multiprocessing pool and inserted by
+    this process with executemany Core inserts, one commit per chunk. Each
+    chunk draws from its own generator seeded by (seed, table, chunk), so a
+    seed and chunk size always produce the same rows whatever the number of
+    workers. All customers share one bcrypt hash of the password, computed
+    once. New ids continue after the existing rows, so it can run on a
+    populated database. The mechanic workload counts are rebuilt at the end
+    and search terms are written alongside their tickets.
+
+    Must be called inside an app context.
+
+    Args:
+        scale: Multiplier of SCALE_UNIT (fractions allowed, e.g. 0.1)
+        seed: Seed making the output reproducible
+        workers: Generator processes (default: one per CPU)
+        chunk_size: Rows per chunk and per insert batch
+        password: Plain password every generated customer logs in with
+        log: Progress callback taking a message
+
+    Returns:
+        A dict of {table: rows inserted}
+    """
+    counts = plan_counts(scale)
+    password_hash = hash_password(password)
+    first = {
+        'customers': _next_id(Customer),
+        'mechanics': _next_id(Mechanic),
+        'inventory': _next_id(Inventory),
+        'service_tickets': _next_id(ServiceTicket),
+    }
+    ranges = {
+        table: (first[table], first[table] + counts[table] - 1)
+        for table in ('customers', 'mechanics', 'inventory')
+    }
+    inserted = dict.fromkeys(['customers', 'mechanics', 'inventory', 'service_tickets',
+                              'service_mechanic', 'service_inventory', 'ticket_terms'], 0)
+
+    with Pool(workers) as pool:
+        plain_tables = [
+            ('customers', Customer.__table__, customer_rows, (password_hash,)),
+            ('mechanics', Mechanic.__table__, mechanic_rows, ()),
+            ('inventory', Inventory.__table__, inventory_rows, ()),
+        ]
+        for name, table, generator, extra in plain_tables:
+            start = time.perf_counter()
+            for rows in pool.imap(generator, _chunks(seed, counts[name], first[name], chunk_size, *extra)):
+                _insert(table, rows)
+                db.session.commit()
+                inserted[name] += len(rows)
+            log(f"Added {inserted[name]} {name} ({inserted[name] / (time.perf_counter() - start):,.0f} rows/s)")
+
+        start = time.perf_counter()
+        tasks = _chunks(seed, counts['service_tickets'], first['service_tickets'], chunk_size,
+                        ranges['customers'], ranges['mechanics'], ranges['inventory'])
+        for tickets, mechanics, parts, terms in pool.imap(ticket_rows, tasks):
+            _insert(ServiceTicket.__table__, tickets)
+            _insert(service_mechanic, mechanics)
+            _insert(service_inventory, parts)
+            _insert(TicketTerm.__table__, terms)
+            db.session.commit()
+            inserted['service_tickets'] += len(tickets)
+            inserted['service_mechanic'] += len(mechanics)
+            inserted['service_inventory'] += len(parts)
+            inserted['ticket_terms'] += len(terms)
+            log(f"  {inserted['service_tickets']}/{counts['service_tickets']} service tickets")
+        log(f"Added {inserted['service_tickets']} service tickets with "
+            f"{inserted['service_mechanic']} mechanic and {inserted['service_inventory']} part assignments "
+            f"({inserted['service_tickets'] / (time.perf_counter() - start):,.0f} tickets/s)")
+
+    rebuild_mechanic_workloads()
+    log("Rebuilt mechanic workload counts")
+    return inserted
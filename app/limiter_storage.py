@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+from limits.storage import Storage, SlidingWindowCounterSupport
+from limits.storage.base import TimestampedSlidingWindow
+
+class SQLiteLimiterStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Rate limit storage in a local SQLite database shared by every worker
+
+    Registered for ``sqlite:///<path>`` storage URIs (same form as SQLAlchemy
+    URIs). Counters survive restarts and are shared by all worker processes
+    on the host, so a "5 per minute" limit means 5 per minute per client
+    instead of 5 per worker. Each check is a couple of primary key lookups
+    and one upsert inside a single IMMEDIATE transaction, so it is O(1) and
+    race free across processes.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    # Expired counters are purged once every this many increments
+    PURGE_INTERVAL = 1000
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        self.path = uri.split('://', 1)[1][1:]
+        self._local = threading.local()
+        self._increments = 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits ('
+            ' key TEXT PRIMARY KEY,'
+            ' count INTEGER NOT NULL,'
+            ' expires REAL NOT NULL)'
+        )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        """Return this thread's connection, reopening it after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _incr(self, conn, key, expiry, amount, now):
+        """Increment a counter, restarting it if it has expired"""
+        self._increments += 1
+        if self._increments % self.PURGE_INTERVAL == 0:
+            conn.execute('DELETE FROM rate_limits WHERE expires <= ?', (now,))
+        return conn.execute(
+            'INSERT INTO rate_limits (key, count, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET '
+            ' count = CASE WHEN expires <= ? THEN excluded.count ELSE count + excluded.count END,'
+            ' expires = CASE WHEN expires <= ? THEN excluded.expires ELSE expires END '
+            'RETURNING count',
+            (key, amount, now + expiry, now, now)
+        ).fetchone()[0]
+
+    def _get(self, conn, key, now):
+        row = conn.execute(
+            'SELECT count FROM rate_limits WHERE key = ? AND expires > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key, expiry, amount=1):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            count = self._incr(conn, key, expiry, amount, time.time())
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return count
+
+    def get(self, key):
+        return self._get(self._connection(), key, time.time())
+
+    def get_expiry(self, key):
+        row = self._connection().execute(
+            'SELECT expires FROM rate_limits WHERE key = ?', (key,)
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._connection().execute('DELETE FROM rate_limits').rowcount
+
+    def clear(self, key):
+        self._connection().execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+    def _window_info(self, conn, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get(conn, previous_key, now)
+        current_count = self._get(conn, current_key, now)
+        if previous_count == 0:
+            previous_ttl = 0.0
+        else:
+            previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        conn = self._connection()
+        # Read both windows and increment under one write lock, so concurrent
+        # workers can never both take the last slot
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            previous_count, previous_ttl, current_count, _ = self._window_info(conn, key, expiry, now)
+            weighted_count = previous_count * previous_ttl / expiry + current_count
+            acquired = floor(weighted_count) + amount <= limit
+            if acquired:
+                _, current_key = self.sliding_window_keys(key, expiry, now)
+                self._incr(conn, current_key, 2 * expiry, amount, now)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return acquired
+
+    def get_sliding_window(self, key, expiry):
+        return self._window_info(self._connection(), key, expiry, time.time())
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
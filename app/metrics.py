@@ -0,0 +1,210 @@
+import bisect
+import threading
+import time
+from flask import Response, request, g
+from app.utils import token_required
+
+# Prefix of every exported metric name
+METRIC_PREFIX = 'mechanic_shop'
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Latency quantiles estimated from the histogram for every endpoint
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+
+def estimate_quantile(bucket_counts, q):
+    """
+    Estimate a quantile from histogram bucket counts
+
+    Interpolates linearly inside the bucket holding the target rank, the
+    same way Prometheus' histogram_quantile() does.
+
+    Args:
+        bucket_counts: Non-cumulative counts per LATENCY_BUCKETS entry, plus
+            a final count for observations above the last bound
+        q: The quantile, between 0 and 1
+
+    Returns:
+        The estimated value in seconds, or 0.0 with no observations
+    """
+    total = sum(bucket_counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(bucket_counts):
+        if cumulative + count >= rank and count:
+            if i == len(LATENCY_BUCKETS):
+                # Above the last finite bucket: report its bound
+                return LATENCY_BUCKETS[-1]
+            lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+            return lower + (LATENCY_BUCKETS[i] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return LATENCY_BUCKETS[-1]
+
+class RequestMetrics:
+    """
+    Per-endpoint request metrics for this worker process
+
+    Every request adds one observation to its endpoint: a latency histogram
+    bucket, a status code counter, and the SQL statement count and database
+    time the query counter measured. Recording is a bisect and a few
+    additions under a lock, so it costs a couple of microseconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, method, status, seconds, statements, db_seconds):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            stats = self._endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self._endpoints[(endpoint, method)] = {
+                    'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+                    'statuses': {},
+                    'latency_sum': 0.0,
+                    'sql_statements': 0,
+                    'sql_statements_max': 0,
+                    'db_seconds': 0.0
+                }
+            stats['buckets'][bucket] += 1
+            stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+            stats['latency_sum'] += seconds
+            stats['sql_statements'] += statements
+            if statements > stats['sql_statements_max']:
+                stats['sql_statements_max'] = statements
+            stats['db_seconds'] += db_seconds
+
+    def snapshot(self):
+        """Return a copy of the per-endpoint stats keyed by (endpoint, method)"""
+        with self._lock:
+            return {
+                key: dict(stats, buckets=list(stats['buckets']), statuses=dict(stats['statuses']))
+                for key, stats in self._endpoints.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+# Request metrics for this worker process
+request_metrics = RequestMetrics()
+
+def _format_labels(**labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}'
+
+def _metric(lines, name, kind, help_text, samples):
+    """Append one metric family in Prometheus text format"""
+    lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+    lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+    for suffix, labels, value in samples:
+        lines.append(f'{METRIC_PREFIX}_{name}{suffix}{_format_labels(**labels) if labels else ""} {value}')
+
+def render_metrics():
+    """
+    Render request, cache and password hashing metrics as Prometheus text
+
+    Returns:
+        The exposition text for GET /metrics
+    """
+    from app.caching import get_cache_stats
+    from app.utils import hash_pool
+
+    endpoints = sorted(request_metrics.snapshot().items())
+    lines = []
+
+    _metric(lines, 'http_requests_total', 'counter', 'Requests handled by endpoint, method and status', [
+        ('', dict(endpoint=endpoint, method=method, status=status), count)
+        for (endpoint, method), stats in endpoints
+        for status, count in sorted(stats['statuses'].items())
+    ])
+
+    latency = []
+    for (endpoint, method), stats in endpoints:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), stats['buckets']):
+            cumulative += count
+            latency.append(('_bucket', dict(endpoint=endpoint, method=method, le=bound), cumulative))
+        latency.append(('_sum', dict(endpoint=endpoint, method=method), round(stats['latency_sum'], 6)))
+        latency.append(('_count', dict(endpoint=endpoint, method=method), cumulative))
+    _metric(lines, 'http_request_duration_seconds', 'histogram', 'Request latency', latency)
+
+    _metric(lines, 'http_request_duration_quantile_seconds', 'gauge',
+            'Request latency quantiles estimated from the histogram', [
+        ('', dict(endpoint=endpoint, method=method, quantile=q), round(estimate_quantile(stats['buckets'], q), 6))
+        for (endpoint, method), stats in endpoints
+        for q in LATENCY_QUANTILES
+    ])
+
+    _metric(lines, 'sql_statements_total', 'counter', 'SQL statements issued by requests', [
+        ('', dict(endpoint=endpoint, method=method), stats['sql_statements'])
+        for (endpoint, method), stats in endpoints
+    ])
+    _metric(lines, 'sql_statements_max', 'gauge', 'Most SQL statements issued by a single request', [
+        ('', dict(endpoint=endpoint, method=method), stats['sql_statements_max'])
+        for (endpoint, method), stats in endpoints
+    ])
+    _metric(lines, 'db_seconds_total', 'counter', 'Time requests spent executing SQL', [
+        ('', dict(endpoint=endpoint, method=method), round(stats['db_seconds'], 6))
+        for (endpoint, method), stats in endpoints
+    ])
+
+    cache_stats = sorted(get_cache_stats().items())
+    _metric(lines, 'cache_hits_total', 'counter', 'Cached GET responses served', [
+        ('', dict(resource=resource), stats['hits']) for resource, stats in cache_stats
+    ])
+    _metric(lines, 'cache_misses_total', 'counter', 'Cacheable GETs computed by the route', [
+        ('', dict(resource=resource), stats['misses']) for resource, stats in cache_stats
+    ])
+    _metric(lines, 'cache_hit_ratio', 'gauge', 'Share of cacheable GETs served from the cache', [
+        ('', dict(resource=resource), stats['hit_rate']) for resource, stats in cache_stats
+    ])
+
+    hash_stats = hash_pool.get_stats()
+    operations = sorted(hash_stats['operations'].items())
+    _metric(lines, 'password_hash_total', 'counter', 'bcrypt operations run on the hash pool', [
+        ('', dict(operation=operation), stats['count']) for operation, stats in operations
+    ])
+    _metric(lines, 'password_hash_rejected_total', 'counter', 'bcrypt operations rejected with 503', [
+        ('', dict(operation=operation), stats['rejected']) for operation, stats in operations
+    ])
+    _metric(lines, 'password_hash_in_flight', 'gauge', 'bcrypt operations currently queued or running', [
+        ('', None, hash_stats['in_flight'])
+    ])
+
+    return '\n'.join(lines) + '\n'
+
+def init_metrics(app):
+    """
+    Register request instrumentation and the GET /metrics endpoint
+
+    Register this before the other extensions so the measured latency
+    covers their request hooks (rate limiting, query counting) too. The
+    endpoint is only added when STATS_ENDPOINTS is set, and needs a token.
+    """
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        app_g = g._get_current_object()
+        start = app_g.get('metrics_start')
+        if start is not None:
+            req = request._get_current_object()
+            request_metrics.record(
+                req.endpoint or 'unmatched', req.method, response.status_code,
+                time.perf_counter() - start, app_g.get('query_count', 0), app_g.get('db_time', 0.0)
+            )
+        return response
+
+    if not app.config.setdefault('STATS_ENDPOINTS', False):
+        return
+
+    @app.route('/metrics', methods=['GET'])
+    @token_required
+    def metrics(customer_id):
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
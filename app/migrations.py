@@ -0,0 +1,194 @@
+from datetime import datetime
+from sqlalchemy import MetaData, inspect, literal
+from sqlalchemy.schema import CreateIndex
+from app import db, Base
+from app.models import Customer, Mechanic, ServiceTicket, MechanicWorkload, service_mechanic, service_inventory
+from app.search import rebuild_search_index
+from app.workload import rebuild_mechanic_workloads
+
+# Tables kept in step with others by the routes, as (source model, function
+# filling the table from it). Created empty on an existing database, they
+# must be filled before the routes reading them return anything
+DERIVED_TABLES = {
+    'mechanic_workloads': (Mechanic, rebuild_mechanic_workloads),
+    'ticket_terms': (ServiceTicket, rebuild_search_index),
+}
+
+def _index_columns(index):
+    """Return the column names an Index covers, ignoring ASC/DESC"""
+    names = []
+    for expression in index.expressions:
+        column = getattr(expression, 'element', expression)
+        names.append(getattr(column, 'name', str(column)))
+    return tuple(names)
+
+def find_missing_columns():
+    """
+    Compare the models with the live database and list columns it lacks
+
+    Tables that don't exist yet are skipped (db.create_all creates them).
+
+    Returns:
+        A list of the models' Column objects missing from existing tables
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in existing_columns)
+    return missing
+
+def _add_column_ddl(column, dialect):
+    """
+    Build the ALTER TABLE statement adding a column to its table
+
+    Existing rows take the column's Python default, evaluated once (so every
+    row of a new updated_at column gets the migration time). A NOT NULL
+    column without a default is added as nullable, since existing rows would
+    have no value for it.
+    """
+    quote = dialect.identifier_preparer.quote
+    ddl = f'ALTER TABLE {quote(column.table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect)}'
+    if column.default is not None and column.default.is_scalar:
+        value = column.default.arg
+    elif column.default is not None and column.default.is_callable:
+        # Whole seconds, which every database accepts as a DATETIME default
+        value = column.default.arg(None)
+        if isinstance(value, datetime):
+            value = value.replace(microsecond=0)
+    else:
+        return ddl
+    default = literal(value, column.type).compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+    ddl += f' DEFAULT {default}'
+    if not column.nullable:
+        ddl += ' NOT NULL'
+    return ddl
+
+def add_missing_columns(columns):
+    """Add the given columns in one transaction, printing the DDL for each"""
+    with db.engine.begin() as connection:
+        for column in columns:
+            ddl = _add_column_ddl(column, connection.dialect)
+            print(ddl + ';')
+            connection.exec_driver_sql(ddl)
+
+def find_unfilled_tables():
+    """
+    List the DERIVED_TABLES that are empty while their source table has rows
+
+    This covers tables db.create_all just added to an existing database, as
+    well as ones an earlier migration left empty.
+
+    Returns:
+        A list of DERIVED_TABLES names
+    """
+    unfilled = []
+    for name, (model, _) in DERIVED_TABLES.items():
+        table = Base.metadata.tables[name]
+        if db.session.execute(db.select(1).select_from(table).limit(1)).first() is not None:
+            continue
+        if db.session.execute(db.select(model.id).limit(1)).first() is not None:
+            unfilled.append(name)
+    return unfilled
+
+def fill_derived_tables(names):
+    """Rebuild the given DERIVED_TABLES from their sources, printing the row counts"""
+    for name in names:
+        count = DERIVED_TABLES[name][1]()
+        print(f"Filled {name} from {count} {DERIVED_TABLES[name][0].__tablename__}")
+
+def find_missing_indexes():
+    """
+    Compare the models with the live database and list indexes it lacks
+
+    Tables that don't exist yet are skipped (db.create_all creates them with
+    every index). A model primary key missing from an existing table, such
+    as the association tables created before they had one, becomes a unique
+    index over the same columns, since adding a primary key in place is not
+    possible on every database.
+
+    Returns:
+        A list of detached Index objects ready to be created
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    # Work on a copy of the metadata so the models' tables are never modified
+    metadata = MetaData()
+    missing = []
+
+    for model_table in Base.metadata.sorted_tables:
+        if model_table.name not in existing_tables:
+            continue
+        table = model_table.to_metadata(metadata)
+
+        existing_names = set()
+        existing_columns = set()
+        pk_columns = inspector.get_pk_constraint(table.name).get('constrained_columns') or []
+        if pk_columns:
+            existing_columns.add(tuple(pk_columns))
+        for index in inspector.get_indexes(table.name) + inspector.get_unique_constraints(table.name):
+            existing_names.add(index['name'])
+            existing_columns.add(tuple(index['column_names']))
+
+        for index in list(table.indexes):
+            if index.name in existing_names or _index_columns(index) in existing_columns:
+                continue
+            missing.append(index)
+
+        model_pk = tuple(column.name for column in table.primary_key.columns)
+        if model_pk and model_pk not in existing_columns and f'uq_{table.name}_pk' not in existing_names:
+            missing.append(db.Index(f'uq_{table.name}_pk', *table.primary_key.columns, unique=True))
+
+    return missing
+
+def create_missing_indexes(indexes):
+    """Create the given indexes in one transaction, printing the DDL for each"""
+    with db.engine.begin() as connection:
+        for index in indexes:
+            print(str(CreateIndex(index).compile(connection)).strip() + ';')
+            index.create(connection)
+
+def hot_queries():
+    """The queries the blueprints run most, with representative parameters"""
+    return [
+        ("Tickets for a customer (/my-tickets)",
+         db.select(ServiceTicket.id).where(ServiceTicket.customer_id == 1).order_by(ServiceTicket.id)),
+        ("Mechanics of a ticket (selectinload)",
+         db.select(service_mechanic.c.mechanic_id).where(service_mechanic.c.service_ticket_id == 1)),
+        ("Tickets of a mechanic",
+         db.select(service_mechanic.c.service_ticket_id).where(service_mechanic.c.mechanic_id == 1)),
+        ("Parts of a ticket (selectinload)",
+         db.select(service_inventory.c.inventory_id).where(service_inventory.c.service_ticket_id == 1)),
+        ("Tickets by VIN",
+         db.select(ServiceTicket.id).where(ServiceTicket.VIN == '1HGBH41JXMN109186').order_by(ServiceTicket.id)),
+        ("Tickets by service date range",
+         db.select(ServiceTicket.id).where(ServiceTicket.service_date.between('2026-01-01', '2026-01-31'))),
+        ("Top mechanics (/mechanics/by-tickets)",
+         db.select(MechanicWorkload.mechanic_id).order_by(
+             MechanicWorkload.ticket_count.desc(), MechanicWorkload.mechanic_id
+         ).limit(10)),
+        ("Customer login lookup",
+         db.select(Customer.id).where(Customer.email == 'john@example.com')),
+    ]
+
+def explain_prefix(dialect):
+    """Return the keyword that asks a dialect's database for a query plan"""
+    return 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+
+def format_plan(rows):
+    """Turn EXPLAIN result rows into a list of lines"""
+    return [' | '.join(str(value) for value in row) for row in rows]
+
+def explain(stmt):
+    """Return the database's query plan for a statement as a list of lines"""
+    sql = str(stmt.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(explain_prefix(db.engine.dialect) + sql).all()
+    return format_plan(rows)
+
+def explain_hot_queries():
+    """Return {query name: plan lines} for every hot query"""
+    return {name: explain(stmt) for name, stmt in hot_queries()}
@@ -1,25 +1,57 @@
 from app import db, Base
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import event
+from sqlalchemy.orm import Mapped, mapped_column, object_session
+from sqlalchemy.orm.attributes import flag_modified
 from typing import List
-from datetime import date
+from datetime import date, datetime, timezone
 
-# Many-to-Many association table for Service_Tickets and Mechanics
+def utcnow():
+    """Current UTC time as a naive datetime, the form DateTime columns store"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class Versioned:
+    """
+    Mixin adding a row version and last modification time
+
+    Both are updated on every ORM flush that changes the row or one of its
+    relationship collections, and tag the detail GET responses with their
+    ETag and Last-Modified headers.
+    """
+    version: Mapped[int] = mapped_column(nullable=False, default=1)
+    updated_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=False, default=utcnow)
+
+@event.listens_for(Versioned, 'before_update', propagate=True)
+def _bump_row_version(mapper, connection, target):
+    # Objects flushed without a net change keep their version
+    if object_session(target).is_modified(target):
+        target.version += 1
+        target.updated_at = utcnow()
+
+def touch(instance):
+    """Bump a versioned row on the next flush, e.g. after Core writes to its association rows"""
+    flag_modified(instance, 'updated_at')
+
+# Many-to-Many association table for Service_Tickets and Mechanics.
+# The composite primary key serves ticket -> mechanics loads and prevents
+# duplicate assignments; the reverse index serves mechanic -> tickets.
 service_mechanic = db.Table(
     'service_mechanic',
     Base.metadata,
-    db.Column('service_ticket_id', db.ForeignKey('service_tickets.id')),
-    db.Column('mechanic_id', db.ForeignKey('mechanics.id'))
+    db.Column('service_ticket_id', db.ForeignKey('service_tickets.id'), primary_key=True),
+    db.Column('mechanic_id', db.ForeignKey('mechanics.id'), primary_key=True),
+    db.Index('ix_service_mechanic_mechanic_id', 'mechanic_id', 'service_ticket_id')
 )
 
 # Many-to-Many association table for Service_Tickets and Inventory
 service_inventory = db.Table(
     'service_inventory',
     Base.metadata,
-    db.Column('service_ticket_id', db.ForeignKey('service_tickets.id')),
-    db.Column('inventory_id', db.ForeignKey('inventory.id'))
+    db.Column('service_ticket_id', db.ForeignKey('service_tickets.id'), primary_key=True),
+    db.Column('inventory_id', db.ForeignKey('inventory.id'), primary_key=True),
+    db.Index('ix_service_inventory_inventory_id', 'inventory_id', 'service_ticket_id')
 )
 
-class Customer(Base):
+class Customer(Versioned, Base):
     __tablename__ = 'customers'
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -32,7 +64,7 @@ class Customer(Base):
     # One-to-Many relationship: One customer can have many service tickets
     service_tickets: Mapped[List['ServiceTicket']] = db.relationship(back_populates='customer')
 
-class ServiceTicket(Base):
+class ServiceTicket(Versioned, Base):
     __tablename__ = 'service_tickets'
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -50,7 +82,14 @@ class ServiceTicket(Base):
     # Many-to-Many relationship: A service ticket can have multiple inventory parts
     inventory_parts: Mapped[List['Inventory']] = db.relationship(secondary=service_inventory, back_populates='service_tickets')
 
-class Mechanic(Base):
+    # Each index ends in id so keyset pagination can seek within a match
+    __table_args__ = (
+        db.Index('ix_service_tickets_customer_id', 'customer_id', 'id'),
+        db.Index('ix_service_tickets_vin', 'VIN', 'id'),
+        db.Index('ix_service_tickets_service_date', 'service_date', 'id'),
+    )
+
+class Mechanic(Versioned, Base):
     __tablename__ = 'mechanics'
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -63,7 +102,7 @@ class Mechanic(Base):
     # Many-to-Many relationship: A mechanic can work on multiple service tickets
     service_tickets: Mapped[List['ServiceTicket']] = db.relationship(secondary=service_mechanic, back_populates='mechanics')
 
-class Inventory(Base):
+class Inventory(Versioned, Base):
     __tablename__ = 'inventory'
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -72,3 +111,52 @@ class Inventory(Base):
 
     # Many-to-Many relationship: An inventory part can be used in multiple service tickets
     service_tickets: Mapped[List['ServiceTicket']] = db.relationship(secondary=service_inventory, back_populates='inventory_parts')
+
+class MechanicWorkload(Base):
+    __tablename__ = 'mechanic_workloads'
+
+    # Number of service tickets each mechanic is assigned to, maintained by the
+    # ticket routes in the same transaction as every service_mechanic change
+    mechanic_id: Mapped[int] = mapped_column(db.ForeignKey('mechanics.id'), primary_key=True)
+    ticket_count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    # Top-N reads for /mechanics/by-tickets walk this index
+    __table_args__ = (
+        db.Index('ix_mechanic_workloads_ticket_count', ticket_count.desc(), mechanic_id),
+    )
+
+class TicketTerm(Base):
+    __tablename__ = 'ticket_terms'
+
+    # Inverted index over ServiceTicket.description: one row per distinct
+    # term per ticket, kept in sync by the service ticket routes
+    term: Mapped[str] = mapped_column(db.String(64), primary_key=True)
+    service_ticket_id: Mapped[int] = mapped_column(db.ForeignKey('service_tickets.id'), primary_key=True)
+    frequency: Mapped[int] = mapped_column(nullable=False)
+
+    # Removing a ticket's postings looks them up by ticket
+    __table_args__ = (
+        db.Index('ix_ticket_terms_service_ticket_id', 'service_ticket_id'),
+    )
+
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+
+    # Tokens of this customer issued before revoked_at (Unix seconds) are
+    # rejected. No foreign key, since the customer is usually deleted; rows
+    # are removed once every token they cover has expired
+    id: Mapped[int] = mapped_column(primary_key=True)
+    customer_id: Mapped[int] = mapped_column(nullable=False)
+    revoked_at: Mapped[int] = mapped_column(nullable=False, index=True)
+
+class Change(Base):
+    __tablename__ = 'changes'
+
+    # Append-only log of writes to the four resources, read by GET /changes.
+    # The id is the sync cursor; each row is written by the blueprints in the
+    # same transaction as the change it records
+    id: Mapped[int] = mapped_column(primary_key=True)
+    resource: Mapped[str] = mapped_column(db.String(32), nullable=False)
+    resource_id: Mapped[int] = mapped_column(nullable=False)
+    op: Mapped[str] = mapped_column(db.String(8), nullable=False)
+    recorded_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=False, default=utcnow)
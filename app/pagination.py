@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import date
+from flask import request
+from sqlalchemy import func, and_, or_
+from app import db
+
+# Page size limits for list endpoints
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page into an opaque cursor string"""
+    values = [value.isoformat() if isinstance(value, date) else value for value in values]
+    raw = json.dumps({'k': values}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('utf-8').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: The opaque cursor string from a previous page
+        columns: The columns the page is ordered by
+
+    Returns:
+        The list of sort key values the next page starts after
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another ordering
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('utf-8')))['k']
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError()
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if python_type is date:
+                value = date.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise ValueError()
+            decoded.append(value)
+    except (ValueError, KeyError, TypeError, AttributeError, NotImplementedError):
+        raise ValueError('Invalid cursor')
+    return decoded
+
+def _after(columns, values):
+    """
+    Build (c1, c2, ...) > (v1, v2, ...) expanded into plain comparisons,
+    which every database can answer with a range seek on a matching index
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column > values[i]))
+    return or_(*clauses)
+
+def get_per_page():
+    """Read per_page from the query string, clamped to 1..MAX_PER_PAGE"""
+    per_page = request.args.get('per_page', DEFAULT_PER_PAGE, type=int)
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+def keyset_paginate(query, *order_columns):
+    """
+    Paginate a select statement on its sort key instead of OFFSET
+
+    Each page is fetched with WHERE key > :cursor ORDER BY key LIMIT per_page + 1,
+    so page N costs the same as page 1. The total row count is only computed
+    when the client asks for it with ?include_total=true.
+
+    Args:
+        query: A db.select() statement for the model being listed
+        order_columns: The columns to order and seek on, ending with the
+            primary key so the ordering is unique (usually just Model.id)
+
+    Returns:
+        A tuple of (items, pagination metadata dict)
+
+    Raises:
+        ValueError: If the cursor query parameter is malformed
+    """
+    per_page = get_per_page()
+    cursor = request.args.get('cursor')
+
+    stmt = query
+    if cursor:
+        stmt = stmt.where(_after(order_columns, decode_cursor(cursor, order_columns)))
+
+    # Fetch one extra row to know whether another page exists
+    rows = db.session.execute(stmt.order_by(*order_columns).limit(per_page + 1)).scalars().all()
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in order_columns])
+
+    pagination = {
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": next_cursor
+    }
+
+    if request.args.get('include_total', 'false').lower() == 'true':
+        pagination["total"] = db.session.execute(
+            db.select(func.count()).select_from(query.subquery())
+        ).scalar()
+
+    return items, pagination
@@ -0,0 +1,86 @@
+from flask import request
+from sqlalchemy.orm import load_only
+
+# Fields added to every projection so items can always be told apart
+ALWAYS_INCLUDED = ('id',)
+
+# Fields that can never be projected, whatever a schema exposes
+NEVER_PROJECTED = frozenset({'password'})
+
+def requested_fields():
+    """Return the names listed in ?fields=, or None when no projection was asked for"""
+    raw = request.args.get('fields', '')
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    return names or None
+
+def column_options(model, names, *required_columns):
+    """
+    Build loader options selecting only some of a model's columns
+
+    Names that aren't columns of the model (relationships, computed or
+    unknown fields) are skipped, as is anything in NEVER_PROJECTED.
+
+    Args:
+        model: The mapped class being selected
+        names: Field names to load
+        required_columns: Columns the route reads itself, loaded as well
+            (e.g. the keyset pagination order columns)
+
+    Returns:
+        A tuple of loader options for select().options() or session.get()
+    """
+    columns = model.__mapper__.column_attrs
+    attributes = [
+        getattr(model, name) for name in names
+        if name in columns and name not in NEVER_PROJECTED
+    ]
+    return (load_only(*attributes, *required_columns),)
+
+def validate_fields(available):
+    """
+    Check ?fields= against the names a route can output
+
+    Anything in NEVER_PROJECTED is refused even if the route could output
+    it. The id is always included.
+
+    Args:
+        available: The field names the route outputs without a projection
+
+    Returns:
+        The set of field names to output, or None without ?fields=
+
+    Raises:
+        ValueError: If a requested field is unknown or not allowed
+    """
+    names = requested_fields()
+    if names is None:
+        return None
+    allowed = [name for name in available if name not in NEVER_PROJECTED]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(allowed)}")
+    return set(names).union(name for name in ALWAYS_INCLUDED if name in allowed)
+
+def project(dumper, model=None, *required_columns):
+    """
+    Apply ?fields= to a route's serializer and query
+
+    Args:
+        dumper: The FastDumper the route serializes with; its fields (which
+            never include load_only fields such as Customer.password) are
+            the ones that can be requested
+        model: The model the route selects, to load only the projected columns
+        required_columns: Columns the route reads itself, loaded as well
+
+    Returns:
+        A tuple of (dumper, loader options); without ?fields= the dumper is
+        returned as it is with no options
+
+    Raises:
+        ValueError: If a requested field is unknown or not allowed
+    """
+    names = validate_fields(dumper.fields)
+    if names is None:
+        return dumper, ()
+    options = column_options(model, names, *required_columns) if model is not None else ()
+    return dumper.only(names), options
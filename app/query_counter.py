@@ -0,0 +1,42 @@
+import time
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Response header carrying the number of SQL statements a request issued
+QUERY_COUNT_HEADER = 'X-Query-Count'
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count every statement executed while an app context is active"""
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+        context._query_start = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    """Add the statement's execution time to the request's database time"""
+    start = getattr(context, '_query_start', None)
+    if start is not None and has_app_context():
+        g.db_time = g.get('db_time', 0.0) + time.perf_counter() - start
+
+def get_query_count():
+    """Return the number of SQL statements issued so far in this request"""
+    return g.get('query_count', 0)
+
+def init_query_counter(app):
+    """
+    Register per-request query counting on a Flask app
+
+    The count starts at zero for every request and is returned to the
+    client in the X-Query-Count response header.
+    """
+    @app.before_request
+    def reset_query_count():
+        g.query_count = 0
+        g.db_time = 0.0
+
+    @app.after_request
+    def add_query_count_header(response):
+        response.headers[QUERY_COUNT_HEADER] = str(get_query_count())
+        return response
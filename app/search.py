@@ -0,0 +1,122 @@
+import math
+import re
+from collections import Counter
+from sqlalchemy import func, case
+from app import db
+from app.models import ServiceTicket, TicketTerm
+
+# Terms are lowercase runs of letters and digits; very common words are skipped
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'was', 'were', 'with'
+})
+MAX_TERM_LENGTH = 64
+
+# Batch size for rebuild_search_index
+REBUILD_CHUNK_SIZE = 1000
+
+def tokenize(text):
+    """Split text into a Counter of index terms"""
+    return Counter(
+        term[:MAX_TERM_LENGTH]
+        for term in TOKEN_PATTERN.findall((text or '').lower())
+        if len(term) > 1 and term not in STOPWORDS
+    )
+
+def index_tickets(tickets):
+    """
+    Add postings for tickets to the inverted index in the current transaction
+
+    Args:
+        tickets: Iterable of (service_ticket_id, description) pairs
+    """
+    rows = [
+        {"term": term, "service_ticket_id": ticket_id, "frequency": frequency}
+        for ticket_id, description in tickets
+        for term, frequency in tokenize(description).items()
+    ]
+    if rows:
+        db.session.execute(TicketTerm.__table__.insert(), rows)
+
+def unindex_tickets(ticket_ids):
+    """Remove the postings for the given tickets in the current transaction"""
+    ticket_ids = list(ticket_ids)
+    if ticket_ids:
+        db.session.execute(
+            TicketTerm.__table__.delete().where(TicketTerm.service_ticket_id.in_(ticket_ids))
+        )
+
+def rebuild_search_index():
+    """
+    Rebuild the whole inverted index from service_tickets
+
+    Tickets are read in id order REBUILD_CHUNK_SIZE at a time, so memory
+    stays flat on large tables.
+
+    Returns:
+        The number of tickets indexed
+    """
+    db.session.execute(TicketTerm.__table__.delete())
+    last_id = 0
+    total = 0
+    while True:
+        rows = db.session.execute(
+            db.select(ServiceTicket.id, ServiceTicket.description)
+            .where(ServiceTicket.id > last_id)
+            .order_by(ServiceTicket.id)
+            .limit(REBUILD_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        index_tickets(rows)
+        last_id = rows[-1][0]
+        total += len(rows)
+    db.session.commit()
+    return total
+
+def search_tickets(query, limit):
+    """
+    Rank tickets whose description contains any of the query's terms
+
+    Each term scores frequency * log(1 + N / document frequency), so rare
+    terms weigh more and tickets matching several terms rank first. Only
+    the posting lists of the query terms are read, never the whole table.
+
+    Args:
+        query: Free text, e.g. "brake squeal"
+        limit: Maximum number of results
+
+    Returns:
+        A list of (service_ticket_id, score) pairs, best match first
+    """
+    terms = list(tokenize(query))
+    if not terms:
+        return []
+
+    document_frequency = dict(db.session.execute(
+        db.select(TicketTerm.term, func.count())
+        .where(TicketTerm.term.in_(terms))
+        .group_by(TicketTerm.term)
+    ).all())
+    if not document_frequency:
+        return []
+
+    # The highest id is an index lookup and close enough to the ticket count
+    total_tickets = db.session.execute(db.select(func.max(ServiceTicket.id))).scalar() or 1
+    weights = {
+        term: math.log(1 + total_tickets / frequency)
+        for term, frequency in document_frequency.items()
+    }
+
+    score = func.sum(TicketTerm.frequency * case(weights, value=TicketTerm.term, else_=0.0)).label('score')
+    return [
+        (ticket_id, round(float(value), 4))
+        for ticket_id, value in db.session.execute(
+            db.select(TicketTerm.service_ticket_id, score)
+            .where(TicketTerm.term.in_(list(weights)))
+            .group_by(TicketTerm.service_ticket_id)
+            .order_by(score.desc(), TicketTerm.service_ticket_id)
+            .limit(limit)
+        ).all()
+    ]
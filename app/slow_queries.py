@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import jsonify, request, has_request_context
+from sqlalchemy import event
+from app import db
+from app.migrations import explain_prefix, format_plan
+from app.utils import token_required
+
+# Statement kinds a plan is captured for (EXPLAIN never executes them)
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE')
+
+# Sort orders accepted by GET /admin/slow-queries
+SORT_KEYS = {'total': 'total_ms', 'max': 'max_ms', 'avg': 'avg_ms', 'count': 'count'}
+
+# A parenthesised run of placeholders, e.g. an expanded IN (?, ?, ?) list,
+# in any of the qmark, format, pyformat and named paramstyles
+_PLACEHOLDER = r'\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*'
+_PLACEHOLDER_LIST = re.compile(rf'\((?:{_PLACEHOLDER},)+{_PLACEHOLDER}\)')
+
+def normalize_statement(statement):
+    """Collapse whitespace and expanded IN lists so each query shape has one key"""
+    return _PLACEHOLDER_LIST.sub('(...)', ' '.join(statement.split()))
+
+def parameter_shape(parameters, executemany=False):
+    """
+    Describe bound parameters by type only, never by value
+
+    Args:
+        parameters: The DBAPI parameters of a statement
+        executemany: True when parameters is a list of parameter sets
+
+    Returns:
+        A string such as "(int, str)", "(int x 50)" or "{email: str}"
+    """
+    if executemany:
+        first = parameter_shape(parameters[0]) if parameters else '()'
+        return f'{len(parameters)} x {first}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{name}: {type(value).__name__}' for name, value in parameters.items()) + '}'
+    # Runs of the same type (IN lists) are shortened to "type x count"
+    runs = []
+    for value in parameters or ():
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return '(' + ', '.join(name if count == 1 else f'{name} x {count}' for name, count in runs) + ')'
+
+class SlowQueryLog:
+    """
+    Opt-in recorder for SQL statements slower than a threshold
+
+    Listens to the cursor events of every engine db creates. A statement
+    taking at least SLOW_QUERY_THRESHOLD_MS is written to a rotating JSON
+    lines file with its duration, parameter shape and the route that ran it,
+    and aggregated per distinct statement for GET /admin/slow-queries, which
+    is only registered while the recorder is enabled and needs a token. The
+    first time a statement is slow its EXPLAIN plan is captured on a separate
+    connection and kept with it, so the plan is fetched once per statement.
+
+    Config:
+        SLOW_QUERY_LOG: Enable the recorder (default: False)
+        SLOW_QUERY_THRESHOLD_MS: Slowest acceptable statement time (default: 100)
+        SLOW_QUERY_LOG_PATH: Log file (default: instance/slow_queries.log)
+        SLOW_QUERY_LOG_MAX_BYTES: Size the log rotates at (default: 5 MB)
+        SLOW_QUERY_LOG_BACKUPS: Rotated files kept (default: 5)
+        SLOW_QUERY_MAX_STATEMENTS: Distinct statements aggregated (default: 500)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold = 0.1
+        self.max_statements = 500
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._explaining = threading.local()
+        self._logger = logging.getLogger('app.slow_queries')
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault('SLOW_QUERY_LOG', False)
+        self.threshold = app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+        self.max_statements = app.config.setdefault('SLOW_QUERY_MAX_STATEMENTS', 500)
+        path = app.config.setdefault('SLOW_QUERY_LOG_PATH', os.path.join(app.instance_path, 'slow_queries.log'))
+        max_bytes = app.config.setdefault('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024)
+        backups = app.config.setdefault('SLOW_QUERY_LOG_BACKUPS', 5)
+
+        if not self.enabled:
+            return
+
+        @app.route('/admin/slow-queries', methods=['GET'])
+        @token_required
+        def slow_queries(customer_id):
+            sort = request.args.get('sort', 'total')
+            if sort not in SORT_KEYS:
+                return jsonify({"error": f"sort must be one of: {', '.join(SORT_KEYS)}"}), 400
+            limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+            return jsonify({
+                "enabled": self.enabled,
+                "threshold_ms": self.threshold * 1000,
+                "statements": self.top_offenders(limit, SORT_KEYS[sort])
+            }), 200
+
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+            handler.close()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._logger.addHandler(handler)
+
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._start_timer)
+            event.listen(engine, 'after_cursor_execute', self._check_duration)
+
+    def _start_timer(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_start = time.perf_counter()
+
+    def _check_duration(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_slow_query_start', None)
+        if start is None or getattr(self._explaining, 'active', False):
+            return
+        seconds = time.perf_counter() - start
+        if seconds >= self.threshold:
+            self._record(conn, statement, parameters, executemany, seconds)
+
+    def _record(self, conn, statement, parameters, executemany, seconds):
+        key = normalize_statement(statement)
+        shape = parameter_shape(parameters, executemany)
+        route = (request.endpoint or 'unmatched') if has_request_context() else '(no request)'
+        ms = seconds * 1000
+
+        with self._lock:
+            entry = self._statements.get(key)
+            first_seen = entry is None and len(self._statements) < self.max_statements
+            if first_seen:
+                entry = self._statements[key] = {
+                    'statement': key, 'parameters': shape, 'count': 0,
+                    'total_ms': 0.0, 'max_ms': 0.0, 'routes': {}, 'plan': None
+                }
+            if entry is not None:
+                entry['count'] += 1
+                entry['total_ms'] += ms
+                entry['max_ms'] = max(entry['max_ms'], ms)
+                entry['routes'][route] = entry['routes'].get(route, 0) + 1
+
+        line = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'duration_ms': round(ms, 2),
+            'route': route,
+            'statement': key,
+            'parameters': shape
+        }
+        if first_seen:
+            entry['plan'] = line['plan'] = self._explain(conn, statement, parameters, executemany)
+        self._logger.info(json.dumps(line))
+
+    def _explain(self, conn, statement, parameters, executemany):
+        """Capture a statement's plan on a separate connection, or None"""
+        words = statement.split(None, 1)
+        if not words or words[0].upper() not in EXPLAINABLE:
+            return None
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        self._explaining.active = True
+        try:
+            with conn.engine.connect() as connection:
+                rows = connection.exec_driver_sql(explain_prefix(conn.dialect) + statement, parameters).all()
+            return format_plan(rows)
+        except Exception as e:
+            return [f'EXPLAIN failed: {e}']
+        finally:
+            self._explaining.active = False
+
+    def top_offenders(self, limit=20, sort='total_ms'):
+        """
+        Return the slowest statements recorded by this worker
+
+        Args:
+            limit: How many statements to return
+            sort: 'total_ms', 'max_ms', 'avg_ms' or 'count'
+
+        Returns:
+            A list of dicts with the statement, parameter shape, count,
+            total/avg/max time, routes that ran it and its plan
+        """
+        with self._lock:
+            entries = [
+                dict(entry, routes=dict(entry['routes']), avg_ms=entry['total_ms'] / entry['count'])
+                for entry in self._statements.values()
+            ]
+        entries.sort(key=lambda entry: entry[sort], reverse=True)
+        for entry in entries:
+            for field in ('total_ms', 'max_ms', 'avg_ms'):
+                entry[field] = round(entry[field], 2)
+        return entries[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+
+# Slow query recorder, attached to the app in create_app
+slow_query_log = SlowQueryLog()
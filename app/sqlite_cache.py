@@ -0,0 +1,214 @@
+import os
+import pickle
+import sqlite3
+import threading
+from time import time
+from flask_caching.backends.base import BaseCache
+
+class SQLiteCache(BaseCache):
+    """
+    Flask-Caching backend stored in a local SQLite database in WAL mode
+
+    Every worker process on the host opens the same file, so they all share
+    one warm cache without running an external cache server. Entries are
+    evicted least-recently-used first once the cache holds more than
+    `threshold` entries or `max_bytes` of pickled values.
+
+    Args:
+        path: Location of the SQLite cache file
+        default_timeout: Seconds before an entry expires (0 = never)
+        threshold: Maximum number of entries to keep
+        max_bytes: Maximum total size of stored values in bytes
+        prune_interval: Check the size limits once every this many writes
+    """
+
+    # Access times are only refreshed when older than this many seconds, so
+    # a hot key doesn't turn every read into a write
+    ACCESS_RESOLUTION = 1.0
+
+    # Keys per SELECT ... IN in get_many, below SQLite's bound parameter limit
+    MANY_CHUNK_SIZE = 500
+
+    def __init__(self, path, default_timeout=300, threshold=10000,
+                 max_bytes=256 * 1024 * 1024, prune_interval=100):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' value BLOB NOT NULL,'
+            ' expires REAL NOT NULL,'
+            ' accessed REAL NOT NULL,'
+            ' size INTEGER NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed)')
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(
+            path=config.get('CACHE_SQLITE_PATH') or os.path.join(app.instance_path, 'cache.sqlite3'),
+            threshold=config['CACHE_THRESHOLD'],
+            max_bytes=config.get('CACHE_SQLITE_MAX_BYTES', 256 * 1024 * 1024)
+        )
+        return cls(*args, **kwargs)
+
+    def _connection(self):
+        """Return this thread's connection, reopening it after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _expires_at(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time() + timeout if timeout > 0 else 0
+
+    def get(self, key):
+        now = time()
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT value, expires, accessed FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        if expires and expires <= now:
+            conn.execute('DELETE FROM cache WHERE key = ? AND expires = ?', (key, expires))
+            return None
+        if now - accessed > self.ACCESS_RESOLUTION:
+            conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+        try:
+            return pickle.loads(value)
+        except (pickle.PickleError, EOFError):
+            return None
+
+    def get_many(self, *keys):
+        """Fetch several keys with one SELECT ... IN per MANY_CHUNK_SIZE keys"""
+        now = time()
+        conn = self._connection()
+        rows = {}
+        for start in range(0, len(keys), self.MANY_CHUNK_SIZE):
+            chunk = keys[start:start + self.MANY_CHUNK_SIZE]
+            rows.update(
+                (key, (value, expires, accessed))
+                for key, value, expires, accessed in conn.execute(
+                    f'SELECT key, value, expires, accessed FROM cache WHERE key IN ({", ".join("?" * len(chunk))})',
+                    chunk
+                )
+            )
+        values = []
+        touched = []
+        for key in keys:
+            row = rows.get(key)
+            # Expired rows are left for _prune()
+            if row is None or (row[1] and row[1] <= now):
+                values.append(None)
+                continue
+            if now - row[2] > self.ACCESS_RESOLUTION:
+                touched.append((now, key))
+            try:
+                values.append(pickle.loads(row[0]))
+            except (pickle.PickleError, EOFError):
+                values.append(None)
+        if touched:
+            conn.executemany('UPDATE cache SET accessed = ? WHERE key = ?', touched)
+        return values
+
+    def set(self, key, value, timeout=None):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)',
+            (key, data, self._expires_at(timeout), time(), len(data))
+        )
+        self._after_write()
+        return True
+
+    def set_many(self, mapping, timeout=None):
+        """Store several keys in a single transaction"""
+        now = time()
+        expires = self._expires_at(timeout)
+        rows = []
+        for key, value in mapping.items():
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            rows.append((key, data, expires, now, len(data)))
+        conn = self._connection()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._after_write(len(rows))
+        return [row[0] for row in rows]
+
+    def add(self, key, value, timeout=None):
+        now = time()
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        # Only replace an existing row if it has already expired
+        cursor = self._connection().execute(
+            'INSERT INTO cache (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, '
+            'accessed = excluded.accessed, size = excluded.size '
+            'WHERE cache.expires != 0 AND cache.expires <= ?',
+            (key, data, self._expires_at(timeout), now, len(data), now)
+        )
+        if cursor.rowcount:
+            self._after_write()
+        return cursor.rowcount > 0
+
+    def delete(self, key):
+        cursor = self._connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def has(self, key):
+        row = self._connection().execute(
+            'SELECT expires FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        return row is not None and (not row[0] or row[0] > time())
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+        return True
+
+    def _after_write(self, count=1):
+        """Run eviction once every prune_interval writes (amortized O(1))"""
+        before = self._writes
+        self._writes += count
+        if self._writes // self.prune_interval != before // self.prune_interval:
+            self._prune()
+
+    def _prune(self):
+        """Drop expired entries, then least recently used ones over the limits"""
+        conn = self._connection()
+        conn.execute('DELETE FROM cache WHERE expires != 0 AND expires <= ?', (time(),))
+        count, total_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache').fetchone()
+        # Evict down to 90% of whichever limits are exceeded so pruning
+        # doesn't run on every write, in one pass over the oldest entries
+        count_target = int(self.threshold * 0.9) if count > self.threshold else count
+        bytes_target = int(self.max_bytes * 0.9) if total_bytes > self.max_bytes else total_bytes
+        if count > count_target or total_bytes > bytes_target:
+            doomed = []
+            for key, size in conn.execute('SELECT key, size FROM cache ORDER BY accessed'):
+                if count <= count_target and total_bytes <= bytes_target:
+                    break
+                doomed.append((key,))
+                count -= 1
+                total_bytes -= size
+            conn.executemany('DELETE FROM cache WHERE key = ?', doomed)
@@ -1,20 +1,150 @@
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from functools import wraps
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from flask import request, jsonify
+import os
+import threading
+import time
 import bcrypt
+from app import db
+from app.models import RevokedToken
 
 # Secret key for JWT encoding/decoding
 SECRET_KEY = "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
+TOKEN_LIFETIME_SECONDS = 24 * 60 * 60
+
+# Maximum number of verified tokens remembered per worker
+TOKEN_CACHE_SIZE = 10000
+
+# Seconds between a worker's reloads of the revoked_tokens table
+REVOCATION_REFRESH_SECONDS = 5
+
+class HashPoolBusy(Exception):
+    """Raised when too many password hashes are already queued"""
+
+class HashPool:
+    """
+    Bounded thread pool for bcrypt work
+
+    bcrypt releases the GIL, so hashing on a small dedicated pool caps how
+    many CPU cores password work can take at once. When more than
+    HASH_POOL_MAX_PENDING hashes are in flight, new requests fail fast with
+    a 503 instead of starving every other endpoint on the worker.
+
+    Config:
+        HASH_POOL_WORKERS: Threads doing bcrypt work (default: half the CPUs)
+        HASH_POOL_MAX_PENDING: Hashes allowed in flight before rejecting
+        BCRYPT_ROUNDS: bcrypt work factor for new hashes (default: 12)
+        STATS_ENDPOINTS: Register GET /hash/stats (default: False)
+    """
+
+    def __init__(self):
+        self.rounds = 12
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {}
+
+    def init_app(self, app):
+        workers = app.config.setdefault('HASH_POOL_WORKERS', max(1, (os.cpu_count() or 2) // 2))
+        max_pending = app.config.setdefault('HASH_POOL_MAX_PENDING', workers * 4)
+        self.rounds = app.config.setdefault('BCRYPT_ROUNDS', 12)
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+        @app.errorhandler(HashPoolBusy)
+        def hash_pool_busy(e):
+            response = jsonify({"error": "Server is busy, please retry shortly"})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+
+        if not app.config.setdefault('STATS_ENDPOINTS', False):
+            return
+
+        @app.route('/hash/stats', methods=['GET'])
+        @token_required
+        def hash_stats(customer_id):
+            return jsonify(self.get_stats()), 200
+
+    def run(self, operation, fn, *args):
+        """
+        Run a bcrypt call on the pool and wait for its result
+
+        Raises:
+            HashPoolBusy: If HASH_POOL_MAX_PENDING hashes are already in flight
+        """
+        if self._executor is None:
+            # Not attached to an app (e.g. scripts): hash inline
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            self._record(operation, None)
+            raise HashPoolBusy()
+        start = time.perf_counter()
+        try:
+            with self._lock:
+                self._in_flight += 1
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            self._record(operation, time.perf_counter() - start)
+
+    def _record(self, operation, seconds):
+        with self._lock:
+            stats = self._stats.setdefault(operation, {'count': 0, 'rejected': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            if seconds is None:
+                stats['rejected'] += 1
+                return
+            ms = seconds * 1000
+            stats['count'] += 1
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+
+    def get_stats(self):
+        """Return latency, rejection counts and current queue depth"""
+        with self._lock:
+            operations = {}
+            for operation, stats in self._stats.items():
+                operations[operation] = {
+                    'count': stats['count'],
+                    'rejected': stats['rejected'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 2) if stats['count'] else 0.0,
+                    'max_ms': round(stats['max_ms'], 2)
+                }
+            return {'in_flight': self._in_flight, 'rounds': self.rounds, 'operations': operations}
+
+# Shared bcrypt pool, attached to the app in create_app
+hash_pool = HashPool()
 
 def hash_password(password):
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using bcrypt with the configured work factor"""
+    hashed = hash_pool.run(
+        'hash', bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(hash_pool.rounds)
+    )
+    return hashed.decode('utf-8')
 
 def verify_password(plain_password, hashed_password):
     """Verify a password against its hash"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return hash_pool.run(
+        'verify', bcrypt.checkpw, plain_password.encode('utf-8'), hashed_password.encode('utf-8')
+    )
+
+def password_needs_rehash(hashed_password):
+    """Return True if a hash was made with a different work factor than BCRYPT_ROUNDS"""
+    try:
+        # bcrypt hashes look like $2b$<rounds>$<salt+hash>
+        return int(hashed_password.split('$')[2]) != hash_pool.rounds
+    except (IndexError, ValueError):
+        return True
 
 def encode_token(customer_id):
     """
@@ -27,14 +157,30 @@ def encode_token(customer_id):
         A JWT token string
     """
     payload = {
-        'exp': datetime.utcnow() + timedelta(days=1),  # Token expires in 1 day
+        'exp': datetime.utcnow() + timedelta(seconds=TOKEN_LIFETIME_SECONDS),  # Token expires in 1 day
         'iat': datetime.utcnow(),  # Token issued at
-        'sub': customer_id  # Subject (customer ID)
+        'sub': str(customer_id)  # Subject (customer ID, JWT requires a string)
     }
     
     token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
     return token
 
+def decode_token_claims(token):
+    """
+    Verify a JWT token and return its claims
+    
+    Args:
+        token: The JWT token string
+        
+    Returns:
+        A (customer_id, exp, iat) tuple, or None if invalid or expired
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload['sub']), payload['exp'], payload.get('iat', 0)
+    except (JWTError, KeyError, ValueError):
+        return None
+
 def decode_token(token):
     """
     Decode a JWT token
@@ -45,11 +191,137 @@ def decode_token(token):
     Returns:
         The customer_id from the token, or None if invalid
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload['sub']
-    except JWTError:
+    claims = decode_token_claims(token)
+    return claims[0] if claims else None
+
+class TokenCache:
+    """
+    Bounded LRU cache of tokens whose signature has already been verified
+
+    Maps token -> (customer_id, exp, iat) so repeat requests from the same
+    session skip jwt.decode. Entries are dropped once the token expires.
+    """
+
+    def __init__(self, maxsize=TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry
+
+    def set(self, token, claims):
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard_customer(self, customer_id):
+        with self._lock:
+            for token in [t for t, entry in self._entries.items() if entry[0] == customer_id]:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Verified tokens for this worker process
+token_cache = TokenCache()
+
+class RevocationList:
+    """
+    Per-worker copy of the revoked_tokens rows that still cover live tokens
+
+    Lookups are dictionary reads; the table is reloaded at most every
+    REVOCATION_REFRESH_SECONDS, so a revocation made on another worker is
+    enforced here within that time. Must be used inside an app context.
+    """
+
+    def __init__(self, refresh_seconds=REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._revoked = {}
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def revoked_at(self, customer_id):
+        """Return the second before which a customer's tokens are rejected, or None"""
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+        return self._revoked.get(customer_id)
+
+    def refresh(self):
+        with self._lock:
+            # Always from the primary, so replica lag doesn't delay revocations
+            rows = db.session.execute(
+                db.select(RevokedToken.customer_id, func.max(RevokedToken.revoked_at))
+                .where(RevokedToken.revoked_at > int(time.time()) - TOKEN_LIFETIME_SECONDS)
+                .group_by(RevokedToken.customer_id),
+                bind_arguments={'bind': db.engine}
+            ).all()
+            self._revoked = dict(rows)
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def add(self, customer_id, revoked_at):
+        with self._lock:
+            self._revoked[customer_id] = max(revoked_at, self._revoked.get(customer_id, 0))
+
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+            self._next_refresh = 0.0
+
+# Revoked customers as seen by this worker process
+revocation_list = RevocationList()
+
+def revoke_customer_tokens(customer_id):
+    """
+    Revoke every token issued to a customer before the current second
+    
+    The revocation is written to revoked_tokens in the current transaction,
+    so call it before committing. This worker enforces it at once and the
+    others within REVOCATION_REFRESH_SECONDS. Tokens carry their issue time
+    in whole seconds, so one issued in the same second stays valid. Rows
+    older than a token's lifetime are deleted along the way.
+    """
+    revoked_at = int(time.time())
+    db.session.execute(
+        RevokedToken.__table__.delete().where(RevokedToken.revoked_at <= revoked_at - TOKEN_LIFETIME_SECONDS)
+    )
+    db.session.execute(RevokedToken.__table__.insert(), {"customer_id": customer_id, "revoked_at": revoked_at})
+    revocation_list.add(customer_id, revoked_at)
+    token_cache.discard_customer(customer_id)
+
+def verify_token(token):
+    """
+    Return the customer_id for a valid token, using the verified-token cache
+    
+    Args:
+        token: The JWT token string
+        
+    Returns:
+        The customer_id, or None if the token is invalid, expired or revoked
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token_claims(token)
+        if claims is None:
+            return None
+        token_cache.set(token, claims)
+    
+    customer_id, exp, issued_at = claims
+    revoked_at = revocation_list.revoked_at(customer_id)
+    if revoked_at is not None and issued_at < revoked_at:
         return None
+    return customer_id
 
 def token_required(f):
     """
@@ -73,8 +345,8 @@ def token_required(f):
         if not token:
             return jsonify({'error': 'Token is missing'}), 401
         
-        # Decode the token
-        customer_id = decode_token(token)
+        # Verify the token (cached after the first successful check)
+        customer_id = verify_token(token)
         
         if customer_id is None:
             return jsonify({'error': 'Invalid or expired token'}), 401
@@ -0,0 +1,63 @@
+from collections import Counter
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app import db
+from app.models import Mechanic, MechanicWorkload, service_mechanic
+
+def adjust_ticket_counts(deltas):
+    """
+    Apply ticket count changes to mechanic_workloads in the current transaction
+
+    Args:
+        deltas: Mapping of mechanic_id to the change in assigned tickets
+            (e.g. {3: 1, 7: -1}), or an iterable of mechanic ids to add 1 to
+
+    Issues a single upsert no matter how many mechanics change, so a
+    mechanic without a workload row yet gets one atomically even when two
+    requests assign them at the same time. Rows are written in mechanic id
+    order so concurrent transactions lock them in the same order.
+    """
+    if not isinstance(deltas, dict):
+        deltas = Counter(deltas)
+    rows = [
+        {"mechanic_id": mechanic_id, "ticket_count": delta}
+        for mechanic_id, delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+
+    table = MechanicWorkload.__table__
+    dialect = db.engine.dialect.name
+    if dialect in ('mysql', 'mariadb'):
+        stmt = mysql_insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(ticket_count=table.c.ticket_count + stmt.inserted.ticket_count)
+    else:
+        stmt = (postgresql_insert if dialect == 'postgresql' else sqlite_insert)(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.mechanic_id],
+            set_={"ticket_count": table.c.ticket_count + stmt.excluded.ticket_count}
+        )
+    db.session.execute(stmt)
+
+def rebuild_mechanic_workloads():
+    """
+    Recompute every mechanic's ticket count from service_mechanic
+
+    Returns:
+        The number of mechanics written
+    """
+    counts = db.session.execute(
+        db.select(Mechanic.id, func.count(service_mechanic.c.service_ticket_id))
+        .outerjoin(service_mechanic, Mechanic.id == service_mechanic.c.mechanic_id)
+        .group_by(Mechanic.id)
+    ).all()
+    db.session.execute(MechanicWorkload.__table__.delete())
+    if counts:
+        db.session.execute(
+            MechanicWorkload.__table__.insert(),
+            [{"mechanic_id": mechanic_id, "ticket_count": count} for mechanic_id, count in counts]
+        )
+    db.session.commit()
+    return len(counts)
@@ -0,0 +1,63 @@
+"""
+Measure the per-request overhead of the rate limiter
+
+Runs a trivial route through the Flask test client with rate limiting
+disabled, with in-memory storage and with the shared SQLite storage, and
+prints the mean time per request and the overhead over the unlimited run.
+
+Usage:
+    python benchmarks/limiter_overhead.py [requests]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from app import limiter_storage  # noqa: F401 (registers the sqlite:// scheme)
+
+def build_app(storage_uri, enabled=True):
+    app = Flask(__name__)
+    app.config['RATELIMIT_ENABLED'] = enabled
+    app.config['RATELIMIT_STORAGE_URI'] = storage_uri
+    app.config['RATELIMIT_STRATEGY'] = 'sliding-window-counter'
+    limiter = Limiter(key_func=get_remote_address, default_limits=["1000000 per day", "1000000 per hour"])
+    limiter.init_app(app)
+
+    @app.route('/ping')
+    def ping():
+        return 'pong'
+
+    return app
+
+def time_requests(app, requests):
+    client = app.test_client()
+    for _ in range(100):
+        client.get('/ping')
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/ping')
+    return (time.perf_counter() - start) / requests * 1e6
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [
+            ('disabled', build_app('memory://', enabled=False)),
+            ('memory://', build_app('memory://')),
+            ('sqlite (shared)', build_app('sqlite:///' + os.path.join(tmp, 'ratelimit.sqlite3')))
+        ]
+        baseline = None
+        print(f"{'storage':<18}{'us/request':>12}{'overhead us':>14}")
+        for name, app in runs:
+            per_request = time_requests(app, requests)
+            if baseline is None:
+                baseline = per_request
+            print(f"{name:<18}{per_request:>12.1f}{per_request - baseline:>14.1f}")
+
+if __name__ == '__main__':
+    main()
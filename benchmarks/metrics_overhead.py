@@ -0,0 +1,70 @@
+"""
+Measure the per-request overhead of the /metrics instrumentation
+
+Times the instrumentation hooks on their own (start timer + record the
+request) inside a request context, then runs a trivial route through the
+Flask test client with and without init_metrics for the end-to-end view.
+
+Usage:
+    python benchmarks/metrics_overhead.py [requests]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, g
+from app.metrics import init_metrics, request_metrics
+from app.query_counter import init_query_counter
+
+def build_app(instrumented):
+    app = Flask(__name__)
+    if instrumented:
+        init_metrics(app)
+    init_query_counter(app)
+
+    @app.route('/ping')
+    def ping():
+        return 'pong'
+
+    return app
+
+def time_hooks(app, calls):
+    """Mean time of the metrics before/after request hooks alone"""
+    before = app.before_request_funcs[None][0]
+    after = app.after_request_funcs[None][0]
+    with app.test_request_context('/ping'):
+        response = app.make_response('pong')
+        g.query_count = 0
+        start = time.perf_counter()
+        for _ in range(calls):
+            before()
+            after(response)
+        return (time.perf_counter() - start) / calls * 1e6
+
+def time_requests(app, requests):
+    client = app.test_client()
+    for _ in range(100):
+        client.get('/ping')
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/ping')
+    return (time.perf_counter() - start) / requests * 1e6
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    plain = build_app(instrumented=False)
+    instrumented = build_app(instrumented=True)
+
+    print(f"instrumentation hooks: {time_hooks(instrumented, requests * 5):.2f} us/request")
+    request_metrics.clear()
+
+    baseline = time_requests(plain, requests)
+    measured = time_requests(instrumented, requests)
+    print(f"{'app':<14}{'us/request':>12}{'overhead us':>14}")
+    print(f"{'plain':<14}{baseline:>12.1f}{0:>14.1f}")
+    print(f"{'instrumented':<14}{measured:>12.1f}{measured - baseline:>14.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""
+Benchmark every blueprint route through the Flask test client
+
+Builds the app with create_app against a SQLite file (or --database, which
+is DROPPED and recreated), seeds it with app.datagen at --scale, then drives
+each customer, mechanic, inventory and service ticket route in turn. For
+every route it reports throughput, latency percentiles, SQL statements per
+request (X-Query-Count) and the peak memory allocated by one request, and
+writes the results as JSON (benchmarks/results/<commit>.json by default).
+
+Pass --compare with an earlier results file to print the change per route;
+the exit status is 1 when a route got slower than --threshold or issues
+more queries, so it can gate a commit. Rate limiting is disabled and the
+response cache is off unless --cache is given, so routes hit the database.
+
+Usage:
+    python benchmarks/routes.py [--scale 0.1] [--requests 200] [--seed 0]
+                                [--database URL] [--cache] [--only PATTERN]
+                                [--output FILE] [--compare FILE] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Ids per request for the batch lookup routes
+BATCH_IDS = 20
+
+# Requests per route used for warm-up, also traced for peak memory
+WARMUP_REQUESTS = 5
+
+# Share of --requests run for routes dominated by bcrypt or full-table work
+SLOW_ROUTE_FACTOR = 0.05
+
+# Latency changes under this many milliseconds are treated as noise
+NOISE_FLOOR_MS = 0.5
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def setup_app(args):
+    """Point the app at the benchmark database, create it and seed it"""
+    os.environ['DATABASE_URL'] = args.database
+    os.environ['CACHE_TYPE'] = 'SimpleCache' if args.cache else 'NullCache'
+    os.environ['RATELIMIT_STORAGE_URI'] = 'memory://'
+    os.environ.pop('DATABASE_REPLICA_URLS', None)
+
+    from app import create_app, db, limiter
+    from app.datagen import generate
+
+    app = create_app()
+    limiter.enabled = False
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f"Seeding {args.database} at scale {args.scale}...")
+        generate(args.scale, seed=args.seed, log=lambda message: None)
+    return app
+
+def add_rows(model, rows):
+    """Insert rows with fresh ids for a model and return the ids"""
+    from app import db
+    from sqlalchemy import func
+    first_id = (db.session.execute(db.select(func.max(model.id))).scalar() or 0) + 1
+    rows = [dict(row, id=first_id + i) for i, row in enumerate(rows)]
+    db.session.execute(model.__table__.insert(), rows)
+    db.session.commit()
+    return [row['id'] for row in rows]
+
+def build_routes(app, requests, seed):
+    """
+    Describe the request sequence of every route
+
+    Routes that consume rows (updates, deletes, ticket mutations) get their
+    own freshly inserted rows, so every request succeeds and the seeded data
+    read by the other routes stays unchanged.
+
+    Returns:
+        A list of (name, expected status, request count, make_request) where
+        make_request(i) returns (method, url, test client keyword arguments)
+    """
+    from app import db
+    from app.models import Customer, Mechanic, Inventory, ServiceTicket
+    from app.utils import encode_token, hash_password
+    from app.datagen import DEFAULT_PASSWORD
+
+    rng = random.Random(seed)
+    slow = max(3, int(requests * SLOW_ROUTE_FACTOR))
+    total = requests + WARMUP_REQUESTS
+
+    with app.app_context():
+        customer_ids = db.session.execute(db.select(Customer.id)).scalars().all()
+        mechanic_ids = db.session.execute(db.select(Mechanic.id)).scalars().all()
+        part_ids = db.session.execute(db.select(Inventory.id)).scalars().all()
+        tickets = db.session.execute(db.select(ServiceTicket.id, ServiceTicket.VIN)).all()
+        password_hash = hash_password(DEFAULT_PASSWORD)
+        spare_customers = add_rows(Customer, [
+            {'name': 'Bench', 'email': f'bench{i}@example.com', 'phone': '555-0000', 'address': '1 Bench St',
+             'password': password_hash} for i in range(total)
+        ])
+        spare_mechanics = add_rows(Mechanic, [
+            {'name': 'Bench', 'email': f'bench{i}@mechanicshop.com', 'phone': '555-0000', 'address': '1 Bench St',
+             'salary': 50000.0} for i in range(total)
+        ])
+        spare_parts = add_rows(Inventory, [{'name': f'Bench part {i}', 'price': 9.99} for i in range(total)])
+        spare_tickets = add_rows(ServiceTicket, [
+            {'VIN': 'BENCH000000000000', 'description': 'Benchmark ticket', 'service_date': date(2026, 1, 1),
+             'customer_id': customer_ids[0]} for i in range(total)
+        ])
+
+    def pick(ids):
+        return rng.choice(ids)
+
+    def auth(customer_id):
+        return {'Authorization': f'Bearer {encode_token(customer_id)}'}
+
+    def new_customer(i):
+        return {'name': 'New', 'email': f'new{i}@example.com', 'phone': '555-0001',
+                'address': '2 New St', 'password': DEFAULT_PASSWORD}
+
+    def new_ticket(i):
+        return {'VIN': f'NEW{i:014d}', 'description': 'Brake pad replacement, customer reports squealing brakes',
+                'service_date': '2026-03-01', 'customer_id': pick(customer_ids)}
+
+    def batch_url(prefix, ids):
+        return f'{prefix}/batch?ids=' + ','.join(str(pick(ids)) for _ in range(BATCH_IDS))
+
+    # Every spare ticket gets this mechanic assigned, then removed again
+    bench_mechanic = mechanic_ids[0]
+
+    return [
+        # Customers
+        ('GET /customers/', 200, requests, lambda i: ('GET', '/customers/?per_page=50', {})),
+        ('GET /customers/<id>', 200, requests, lambda i: ('GET', f'/customers/{pick(customer_ids)}', {})),
+        ('GET /customers/batch (20)', 200, requests, lambda i: ('GET', batch_url('/customers', customer_ids), {})),
+        ('GET /customers/my-tickets', 200, requests,
+         lambda i: ('GET', '/customers/my-tickets', {'headers': auth(pick(customer_ids))})),
+        ('POST /customers/login', 200, slow, lambda i: ('POST', '/customers/login', {
+            'json': {'email': f'customer{pick(customer_ids)}@example.com', 'password': DEFAULT_PASSWORD}})),
+        ('POST /customers/', 201, slow, lambda i: ('POST', '/customers/', {'json': new_customer(i)})),
+        ('PUT /customers/<id>', 200, requests, lambda i: ('PUT', f'/customers/{spare_customers[i]}', {
+            'headers': auth(spare_customers[i]), 'json': {'name': f'Updated {i}'}})),
+        ('DELETE /customers/<id>', 200, requests, lambda i: ('DELETE', f'/customers/{spare_customers[i]}', {
+            'headers': auth(spare_customers[i])})),
+        # The spare tickets all belong to the first customer, whose deletion is refused
+        ('DELETE /customers/<id> (has tickets)', 409, requests, lambda i: ('DELETE', f'/customers/{customer_ids[0]}', {
+            'headers': auth(customer_ids[0])})),
+
+        # Mechanics
+        ('GET /mechanics/', 200, requests, lambda i: ('GET', '/mechanics/?per_page=50', {})),
+        ('GET /mechanics/by-tickets', 200, requests, lambda i: ('GET', '/mechanics/by-tickets', {})),
+        ('GET /mechanics/<id>', 200, requests, lambda i: ('GET', f'/mechanics/{pick(mechanic_ids)}', {})),
+        ('GET /mechanics/batch (20)', 200, requests, lambda i: ('GET', batch_url('/mechanics', mechanic_ids), {})),
+        ('POST /mechanics/', 201, requests, lambda i: ('POST', '/mechanics/', {'json': {
+            'name': 'New', 'email': f'new{i}@mechanicshop.com', 'phone': '555-0001',
+            'address': '2 New St', 'salary': 60000.0}})),
+        ('PUT /mechanics/<id>', 200, requests,
+         lambda i: ('PUT', f'/mechanics/{spare_mechanics[i]}', {'json': {'salary': 61000.0 + i}})),
+        ('DELETE /mechanics/<id>', 200, requests, lambda i: ('DELETE', f'/mechanics/{spare_mechanics[i]}', {})),
+
+        # Inventory
+        ('GET /inventory/', 200, requests, lambda i: ('GET', '/inventory/?per_page=50', {})),
+        ('GET /inventory/<id>', 200, requests, lambda i: ('GET', f'/inventory/{pick(part_ids)}', {})),
+        ('GET /inventory/batch (20)', 200, requests, lambda i: ('GET', batch_url('/inventory', part_ids), {})),
+        ('POST /inventory/', 201, requests,
+         lambda i: ('POST', '/inventory/', {'json': {'name': f'New part {i}', 'price': 19.99}})),
+        ('PUT /inventory/<id>', 200, requests,
+         lambda i: ('PUT', f'/inventory/{spare_parts[i]}', {'json': {'price': 20.0 + i}})),
+        ('DELETE /inventory/<id>', 200, requests, lambda i: ('DELETE', f'/inventory/{spare_parts[i]}', {})),
+
+        # Service tickets
+        ('GET /service-tickets/', 200, requests, lambda i: ('GET', '/service-tickets/?per_page=50', {})),
+        ('GET /service-tickets/?fields', 200, requests,
+         lambda i: ('GET', '/service-tickets/?per_page=50&fields=id,VIN', {})),
+        ('GET /service-tickets/<id>', 200, requests,
+         lambda i: ('GET', f'/service-tickets/{pick(tickets)[0]}', {})),
+        ('GET /service-tickets/<id>?include', 200, requests,
+         lambda i: ('GET', f'/service-tickets/{pick(tickets)[0]}?include=customer,mechanics,parts', {})),
+        ('GET /service-tickets/batch (20)', 200, requests,
+         lambda i: ('GET', batch_url('/service-tickets', [ticket[0] for ticket in tickets]), {})),
+        ('GET /service-tickets/search?vin', 200, requests,
+         lambda i: ('GET', f'/service-tickets/search?vin={pick(tickets)[1]}', {})),
+        ('GET /service-tickets/search?dates', 200, requests, lambda i: (
+            'GET', '/service-tickets/search?start_date=2026-01-01&end_date=2026-01-31&per_page=50', {})),
+        ('GET /service-tickets/search/text', 200, requests,
+         lambda i: ('GET', '/service-tickets/search/text?q=brake+squealing', {})),
+        ('GET /service-tickets/export', 200, slow, lambda i: ('GET', '/service-tickets/export', {})),
+        ('POST /service-tickets/', 201, requests, lambda i: ('POST', '/service-tickets/', {'json': new_ticket(i)})),
+        ('POST /service-tickets/bulk (100)', 201, slow, lambda i: ('POST', '/service-tickets/bulk', {'json': [
+            dict(new_ticket(i), mechanic_ids=[pick(mechanic_ids)], part_ids=[pick(part_ids)]) for _ in range(100)
+        ]})),
+        ('PUT /service-tickets/<id>/edit', 200, requests, lambda i: ('PUT', f'/service-tickets/{pick(tickets)[0]}/edit', {
+            'json': {'add_ids': [pick(mechanic_ids)], 'remove_ids': [pick(mechanic_ids)]}})),
+        ('PUT /service-tickets/<id>/add-part/<id>', 200, requests,
+         lambda i: ('PUT', f'/service-tickets/{spare_tickets[i]}/add-part/{pick(part_ids)}', {})),
+        ('PUT /service-tickets/<id>/assign-mechanic/<id>', 200, requests,
+         lambda i: ('PUT', f'/service-tickets/{spare_tickets[i]}/assign-mechanic/{bench_mechanic}', {})),
+        ('PUT /service-tickets/<id>/remove-mechanic/<id>', 200, requests,
+         lambda i: ('PUT', f'/service-tickets/{spare_tickets[i]}/remove-mechanic/{bench_mechanic}', {})),
+        ('DELETE /service-tickets/<id>', 200, requests,
+         lambda i: ('DELETE', f'/service-tickets/{spare_tickets[i]}', {})),
+    ]
+
+def run_route(client, expected_status, count, make_request):
+    """Warm a route up (tracing memory), then time count requests"""
+    errors = 0
+    peak_bytes = 0
+    tracemalloc.start()
+    for i in range(WARMUP_REQUESTS):
+        method, url, kwargs = make_request(i)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+        peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1] - baseline)
+        errors += response.status_code != expected_status
+    tracemalloc.stop()
+
+    latencies = []
+    queries = []
+    start = time.perf_counter()
+    for i in range(WARMUP_REQUESTS, WARMUP_REQUESTS + count):
+        method, url, kwargs = make_request(i)
+        request_start = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        response.get_data()
+        latencies.append((time.perf_counter() - request_start) * 1000)
+        queries.append(int(response.headers.get('X-Query-Count', 0)))
+        errors += response.status_code != expected_status
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': count,
+        'errors': errors,
+        'throughput_rps': round(count / elapsed, 1),
+        'latency_ms': {
+            'mean': round(sum(latencies) / count, 3),
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3)
+        },
+        'queries': {'mean': round(sum(queries) / count, 2), 'max': max(queries)},
+        'peak_memory_kb': round(peak_bytes / 1024, 1)
+    }
+
+def compare(results, baseline, threshold):
+    """Print the change per route against a baseline and return the regressions"""
+    regressions = []
+    print(f"\n{'route':<50}{'p50 ms':>16}{'p95 ms':>16}{'queries':>12}")
+    for name, current in results['routes'].items():
+        previous = baseline['routes'].get(name)
+        if previous is None:
+            continue
+        flags = []
+        for key in ('p50', 'p95'):
+            before, after = previous['latency_ms'][key], current['latency_ms'][key]
+            if after - before > NOISE_FLOOR_MS and after > before * (1 + threshold):
+                flags.append(f'{key} {before:.2f} -> {after:.2f} ms')
+        if current['queries']['mean'] > previous['queries']['mean']:
+            flags.append(f"queries {previous['queries']['mean']} -> {current['queries']['mean']}")
+        print(f"{name:<50}"
+              f"{previous['latency_ms']['p50']:>7.2f} -> {current['latency_ms']['p50']:<6.2f}"
+              f"{previous['latency_ms']['p95']:>7.2f} -> {current['latency_ms']['p95']:<6.2f}"
+              f"{previous['queries']['mean']:>5} -> {current['queries']['mean']:<4}"
+              f"{'  REGRESSION' if flags else ''}")
+        if flags:
+            regressions.append((name, flags))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every blueprint route")
+    parser.add_argument('--scale', type=float, default=0.1, help="Seed data scale (see populate_database.py)")
+    parser.add_argument('--requests', type=int, default=200, help="Timed requests per route")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', help="Database URL; it is dropped and recreated (default: temporary SQLite)")
+    parser.add_argument('--cache', action='store_true', help="Enable the response cache")
+    parser.add_argument('--only', help="Only run routes whose name contains this text")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare with")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.database = args.database or 'sqlite:///' + os.path.join(tmp, 'benchmark.db')
+        app = setup_app(args)
+        client = app.test_client()
+        routes = build_routes(app, args.requests, args.seed)
+
+        results = {
+            'meta': {
+                'commit': git_commit(),
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'database': args.database.split(':', 1)[0],
+                'scale': args.scale,
+                'seed': args.seed,
+                'requests': args.requests,
+                'cache': args.cache
+            },
+            'routes': {}
+        }
+        print(f"{'route':<50}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'peak KB':>9}{'errors':>8}")
+        for name, expected_status, count, make_request in routes:
+            if args.only and args.only not in name:
+                continue
+            result = run_route(client, expected_status, count, make_request)
+            results['routes'][name] = result
+            latency = result['latency_ms']
+            print(f"{name:<50}{result['throughput_rps']:>9.1f}{latency['p50']:>9.2f}{latency['p95']:>9.2f}"
+                  f"{latency['p99']:>9.2f}{result['queries']['mean']:>9.1f}{result['peak_memory_kb']:>9.1f}"
+                  f"{result['errors']:>8}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} route(s) regressed:")
+            for name, flags in regressions:
+                print(f"  {name}: {', '.join(flags)}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare schema.dump() with the precompiled FastDumper for every model
+
+Builds transient model objects (no database needed), dumps them with the
+marshmallow schema and with its FastDumper, checks the output is identical
+and prints the time per object for each.
+
+Usage:
+    python benchmarks/serializer_speed.py [objects]
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.models import Customer, Mechanic, Inventory, ServiceTicket
+from app.blueprints.customer.schemas import customers_schema, customers_fast_schema
+from app.blueprints.mechanic.schemas import mechanics_schema, mechanics_fast_schema
+from app.blueprints.inventory.schemas import inventories_schema, inventories_fast_schema
+from app.blueprints.service_ticket.schemas import (
+    service_tickets_schema, service_tickets_fast_schema,
+    service_tickets_detail_schema, service_tickets_detail_fast_schema
+)
+
+def build_objects(count):
+    customers = [Customer(id=i, name=f'Customer {i}', email=f'c{i}@example.com', phone='555-0100',
+                          address=f'{i} Main St', password='hashed') for i in range(count)]
+    mechanics = [Mechanic(id=i, name=f'Mechanic {i}', email=f'm{i}@example.com', phone='555-0101',
+                          address=f'{i} Shop Rd', salary=50000.0 + i) for i in range(count)]
+    parts = [Inventory(id=i, name=f'Part {i}', price=9.99 + i) for i in range(count)]
+    tickets = []
+    for i in range(count):
+        ticket = ServiceTicket(id=i, VIN=f'VIN{i:014d}', description=f'Service {i}',
+                               service_date=date(2026, 1, 1) + timedelta(days=i % 365),
+                               customer_id=i, customer=customers[i])
+        ticket.mechanics = [mechanics[i], mechanics[(i + 1) % count]]
+        ticket.inventory_parts = [parts[i]]
+        tickets.append(ticket)
+    return customers, mechanics, parts, tickets
+
+def time_dump(dump, objects):
+    start = time.perf_counter()
+    result = dump(objects)
+    return result, (time.perf_counter() - start) / len(objects) * 1e6
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    app = create_app()
+    with app.app_context():
+        customers, mechanics, parts, tickets = build_objects(count)
+        runs = [
+            ('customers', customers_schema, customers_fast_schema, customers),
+            ('mechanics', mechanics_schema, mechanics_fast_schema, mechanics),
+            ('inventory', inventories_schema, inventories_fast_schema, parts),
+            ('tickets', service_tickets_schema, service_tickets_fast_schema, tickets),
+            ('ticket details', service_tickets_detail_schema, service_tickets_detail_fast_schema, tickets),
+        ]
+        print(f"{'model':<16}{'schema us':>12}{'fast us':>10}{'speedup':>10}")
+        for name, schema, fast_schema, objects in runs:
+            expected, schema_time = time_dump(schema.dump, objects)
+            actual, fast_time = time_dump(fast_schema.dump, objects)
+            if actual != expected:
+                raise SystemExit(f"{name}: FastDumper output differs from schema.dump()")
+            print(f"{name:<16}{schema_time:>12.2f}{fast_time:>10.2f}{schema_time / fast_time:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
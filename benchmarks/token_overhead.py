@@ -0,0 +1,55 @@
+"""
+Measure the overhead of token_required with and without the verified-token cache
+
+Calls a token_required-decorated no-op inside a request context carrying a
+valid Bearer token. The "uncached" run clears the verified-token cache
+before every call, which is what the decorator cost before the cache; the
+"cached" run is the steady state for a session making repeat requests. Both
+include the revocation check, which reloads revoked_tokens from the
+database every REVOCATION_REFRESH_SECONDS.
+
+Usage:
+    python benchmarks/token_overhead.py [calls]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# An in-memory database holding the revoked_tokens table, unless one is given
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app, db
+from app.utils import encode_token, token_required, token_cache
+
+@token_required
+def protected(customer_id):
+    return customer_id
+
+def time_calls(app, token, calls, clear_cache):
+    with app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+        protected()
+        start = time.perf_counter()
+        for _ in range(calls):
+            if clear_cache:
+                token_cache.clear()
+            protected()
+        return (time.perf_counter() - start) / calls * 1e6
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    token = encode_token(1)
+
+    uncached = time_calls(app, token, calls, clear_cache=True)
+    cached = time_calls(app, token, calls, clear_cache=False)
+    print(f"{'mode':<10}{'us/call':>10}")
+    print(f"{'uncached':<10}{uncached:>10.1f}")
+    print(f"{'cached':<10}{cached:>10.1f}")
+    print(f"speedup: {uncached / cached:.1f}x")
+
+if __name__ == '__main__':
+    main()
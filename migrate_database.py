@@ -0,0 +1,50 @@
+from app import create_app, db
+from app.migrations import (
+    find_missing_columns, add_missing_columns, find_unfilled_tables, fill_derived_tables,
+    find_missing_indexes, create_missing_indexes, explain_hot_queries
+)
+
+# Create the Flask app
+app = create_app()
+
+with app.app_context():
+    # Create any tables that don't exist yet; existing tables and data are kept
+    print("Creating missing tables...")
+    db.create_all()
+    
+    # Columns added to existing models since their tables were created
+    columns = find_missing_columns()
+    if columns:
+        print(f"\nAdding {len(columns)} missing columns...")
+        add_missing_columns(columns)
+    else:
+        print("All columns are already in place.")
+    
+    # Ticket counts and search terms for the data already in the database
+    tables = find_unfilled_tables()
+    if tables:
+        print(f"\nFilling {len(tables)} derived tables...")
+        fill_derived_tables(tables)
+    
+    indexes = find_missing_indexes()
+    if not indexes:
+        print("All indexes are already in place.")
+    else:
+        before = explain_hot_queries()
+        
+        print(f"\nCreating {len(indexes)} missing indexes...")
+        create_missing_indexes(indexes)
+        
+        after = explain_hot_queries()
+        
+        print("\nQuery plans for the hot queries (before -> after):")
+        for name in before:
+            print(f"\n== {name}")
+            print("  before:")
+            for line in before[name]:
+                print(f"    {line}")
+            print("  after:")
+            for line in after[name]:
+                print(f"    {line}")
+    
+    print("\nDatabase migrated successfully!")
@@ -1,12 +1,23 @@
+"""
+Populate the database with sample data, or a synthetic dataset for load testing
+
+Usage:
+    python populate_database.py
+        Adds 3 customers, 3 mechanics, 10 parts and 5 tickets
+    python populate_database.py --scale 1000 [--seed 42] [--workers 8] [--chunk-size 10000]
+        Bulk-loads 1,000 customers, 10 mechanics, 20 parts and 10,000 tickets
+        (with mechanic/part assignments and search terms) per unit of scale
+"""
+import argparse
 from app import create_app, db
 from app.models import Customer, ServiceTicket, Mechanic, Inventory
 from app.utils import hash_password
+from app.workload import rebuild_mechanic_workloads
+from app.search import rebuild_search_index
+from app.datagen import generate, plan_counts, DEFAULT_CHUNK_SIZE, DEFAULT_PASSWORD
 from datetime import date
 
-# Create the Flask app
-app = create_app()
-
-with app.app_context():
+def populate_sample_data():
     print("Populating database with sample data...")
     
     # Create sample customers with hashed passwords
@@ -148,8 +159,44 @@ with app.app_context():
     db.session.commit()
     print("Assigned mechanics and parts to service tickets")
     
+    # Seed the maintained per-mechanic ticket counts
+    rebuild_mechanic_workloads()
+    print("Rebuilt mechanic workload counts")
+    
+    # Index the ticket descriptions for full-text search
+    rebuild_search_index()
+    print("Rebuilt the ticket description search index")
+    
     print("\nDatabase populated successfully!")
     print("\nTest Login Credentials:")
     print("Email: john@example.com | Password: password123")
     print("Email: jane@example.com | Password: password123")
     print("Email: bob@example.com | Password: password123")
+
+def populate_synthetic_data(scale, seed, workers, chunk_size):
+    counts = plan_counts(scale)
+    print(f"Generating synthetic data at scale {scale} (seed {seed}): "
+          + ", ".join(f"{count:,} {table}" for table, count in counts.items()))
+    generate(scale, seed=seed, workers=workers, chunk_size=chunk_size)
+    print("\nDatabase populated successfully!")
+    print(f"\nEvery generated customer (customer<id>@example.com) logs in with password: {DEFAULT_PASSWORD}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate the database with sample or synthetic data")
+    parser.add_argument('--scale', type=float, help="Generate synthetic data; 1 unit = 1,000 customers and 10,000 tickets")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for reproducible synthetic data (default: 0)")
+    parser.add_argument('--workers', type=int, help="Generator processes (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per insert batch")
+    args = parser.parse_args()
+
+    # Create the Flask app
+    app = create_app()
+
+    with app.app_context():
+        if args.scale:
+            populate_synthetic_data(args.scale, args.seed, args.workers, args.chunk_size)
+        else:
+            populate_sample_data()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+from flask import current_app
+from app import create_app
+from app.changes import prune_changes
+
+# Create the Flask app
+app = create_app()
+
+with app.app_context():
+    retention_days = current_app.config['CHANGE_FEED_RETENTION_DAYS']
+    print(f"Deleting changes older than {retention_days:g} days from the change feed...")
+    count = prune_changes(retention_days)
+    print(f"Deleted {count} changes")
@@ -0,0 +1,13 @@
+from app import create_app, db
+from app.search import rebuild_search_index
+
+# Create the Flask app
+app = create_app()
+
+with app.app_context():
+    # Make sure the ticket_terms table exists on older databases
+    db.create_all()
+    
+    print("Rebuilding the full-text index over service ticket descriptions...")
+    count = rebuild_search_index()
+    print(f"Indexed {count} service tickets")
@@ -0,0 +1,13 @@
+from app import create_app, db
+from app.workload import rebuild_mechanic_workloads
+
+# Create the Flask app
+app = create_app()
+
+with app.app_context():
+    # Make sure the mechanic_workloads table exists on older databases
+    db.create_all()
+    
+    print("Rebuilding mechanic ticket counts from service_mechanic...")
+    count = rebuild_mechanic_workloads()
+    print(f"Reconciled ticket counts for {count} mechanics")
@@ -21,3 +21,7 @@ with app.app_context():
     print("- inventory (NEW)")
     print("- service_mechanic (junction table)")
     print("- service_inventory (junction table - NEW)")
+    print("- mechanic_workloads (maintained ticket counts per mechanic)")
+    print("- ticket_terms (full-text index over ticket descriptions)")
+    print("- revoked_tokens (token revocations of deleted customers)")
+    print("- changes (delta sync feed)")